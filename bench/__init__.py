@@ -0,0 +1 @@
+"""Offline load tests and price backtests for RCN Prime"""
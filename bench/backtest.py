@@ -0,0 +1,312 @@
+"""Replay the hourly price formula over historical ledger data
+
+Streams ``transactions``, ``posts``, ``reviews`` and ``price_history`` into
+hourly NumPy bins, rebuilds the 24h metrics the price engine sees with
+windowed sums, and replays ``next_price`` for every parameter set at once.
+Every set gets the same noise draws, so the paths differ only by parameters.
+
+    python -m bench.backtest --days 90
+    python -m bench.backtest --days 180 --grid demand_weight=0.05,0.1,0.5 whale_bump=0,0.2,0.8
+    python -m bench.backtest --paths paths.csv    # write every price path
+
+The first parameter set is always the one running live. Requires numpy
+(pip install numpy). It is not needed by the bot itself.
+"""
+import argparse
+import itertools
+import sys
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from core.metrics import (
+    WHALE_THRESHOLD, METRICS_WINDOW, ACTIVITY_SCALE, VOLUME_SCALE,
+    DEMAND_WEIGHTS, DEMAND_WEIGHT, SUPPLY_WEIGHT, WHALE_BUMP, PRICE_FLOOR
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HOUR = 3600
+WINDOW_HOURS = int(METRICS_WINDOW.total_seconds() // HOUR)
+# Documents converted to arrays per batch while streaming
+STREAM_BATCH = 50000
+# Price the engine starts from when price_history is empty
+DEFAULT_PRICE = 0.03
+
+PARAMETERS = {
+    "activity_weight": DEMAND_WEIGHTS[0],
+    "volume_weight": DEMAND_WEIGHTS[1],
+    "posts_weight": DEMAND_WEIGHTS[2],
+    "reviews_weight": DEMAND_WEIGHTS[3],
+    "demand_weight": DEMAND_WEIGHT,
+    "supply_weight": SUPPLY_WEIGHT,
+    "whale_bump": WHALE_BUMP,
+    "floor": PRICE_FLOOR
+}
+
+
+def epoch(value):
+    """Seconds since the epoch for naive-UTC datetimes and float epochs alike"""
+    if isinstance(value, datetime):
+        return (value - datetime(1970, 1, 1)).total_seconds()
+    return float(value)
+
+
+def stream(cursor, fields):
+    """Yield one float array per field for every STREAM_BATCH documents"""
+    rows = []
+    for doc in cursor:
+        rows.append(tuple(field(doc) for field in fields))
+        if len(rows) == STREAM_BATCH:
+            yield [np.asarray(column, dtype=float) for column in zip(*rows)]
+            rows = []
+    if rows:
+        yield [np.asarray(column, dtype=float) for column in zip(*rows)]
+
+
+def hour_index(seconds, start: float, hours: int):
+    """Hour bin of each timestamp, and a mask of those inside [0, hours)"""
+    index = np.floor((seconds - start) / HOUR).astype(np.int64)
+    return index, (index >= 0) & (index < hours)
+
+
+def bin_sum(index, mask, weights, hours: int):
+    return np.bincount(index[mask], weights=None if weights is None else weights[mask], minlength=hours)
+
+
+def windowed_sum(hourly, window: int = WINDOW_HOURS):
+    """Sum of each hour and the window - 1 hours before it"""
+    total = np.concatenate(([0.0], np.cumsum(hourly, dtype=float)))
+    ends = np.arange(1, len(hourly) + 1)
+    return total[ends] - total[np.maximum(ends - window, 0)]
+
+
+def load_ledger(db, start: datetime, hours: int):
+    """Hourly transaction count, trade count, trade volume and whale trades"""
+    # Bins reach back one window so the first hours see a full 24h
+    origin = epoch(start) - WINDOW_HOURS * HOUR
+    span = hours + WINDOW_HOURS
+    tx = np.zeros(span)
+    trades = np.zeros(span)
+    volume = np.zeros(span)
+    whales = np.zeros(span)
+
+    cursor = db.transactions.find(
+        {"timestamp": {"$gte": start - METRICS_WINDOW, "$lt": start + timedelta(hours=hours)}},
+        projection={"_id": 0, "timestamp": 1, "type": 1, "amount": 1}
+    ).batch_size(STREAM_BATCH)
+    fields = (
+        lambda doc: epoch(doc["timestamp"]),
+        lambda doc: doc.get("type") == "trade",
+        lambda doc: abs(doc.get("amount") or 0)
+    )
+    for seconds, is_trade, amount in stream(cursor, fields):
+        index, mask = hour_index(seconds, origin, span)
+        tx += bin_sum(index, mask, None, span)
+        trade = mask & (is_trade > 0)
+        trades += bin_sum(index, trade, None, span)
+        volume += bin_sum(index, trade, amount, span)
+        whales += bin_sum(index, trade & (amount > WHALE_THRESHOLD), None, span)
+
+    return {name: windowed_sum(series)[WINDOW_HOURS:]
+            for name, series in (("tx", tx), ("trades", trades), ("volume", volume), ("whales", whales))}
+
+
+def load_posts(db, start: datetime, hours: int):
+    """Posts live (created, not yet expired) at each hour
+
+    Approval and rejection times are not recorded, so every post that was
+    ever approved counts from creation until expiry.
+    """
+    origin = epoch(start)
+    change = np.zeros(hours + 1)
+    cursor = db.posts.find(
+        {"status": {"$in": ["active", "expired"]}},
+        projection={"_id": 0, "created_at": 1, "expires_at": 1}
+    ).batch_size(STREAM_BATCH)
+    fields = (lambda doc: epoch(doc["created_at"]), lambda doc: epoch(doc["expires_at"]))
+    for created, expires in stream(cursor, fields):
+        # Hour h is sampled at its end, origin + (h + 1) hours
+        opened = np.clip(np.ceil((created - origin) / HOUR) - 1, 0, hours).astype(np.int64)
+        closed = np.clip(np.ceil((expires - origin) / HOUR) - 1, 0, hours).astype(np.int64)
+        np.add.at(change, opened, 1)
+        np.add.at(change, closed, -1)
+    return np.cumsum(change)[:hours]
+
+
+def load_reviews(db, start: datetime, hours: int):
+    """Reviews written up to each hour"""
+    origin = epoch(start)
+    before = db.reviews.count_documents({"created_at": {"$lt": start}})
+    hourly = np.zeros(hours)
+    cursor = db.reviews.find(
+        {"created_at": {"$gte": start, "$lt": start + timedelta(hours=hours)}},
+        projection={"_id": 0, "created_at": 1}
+    ).batch_size(STREAM_BATCH)
+    for (seconds,) in stream(cursor, (lambda doc: epoch(doc["created_at"]),)):
+        index, mask = hour_index(seconds, origin, hours)
+        hourly += bin_sum(index, mask, None, hours)
+    return before + np.cumsum(hourly)
+
+
+def load_prices(db, start: datetime, hours: int):
+    """Recorded price at the end of each hour, carried forward; and the opening price"""
+    origin = epoch(start)
+    opening = db.price_history.find_one({"timestamp": {"$lt": start}}, sort=[("timestamp", -1)])
+    last = opening["new_price"] if opening else DEFAULT_PRICE
+
+    times, prices = [], []
+    cursor = db.price_history.find(
+        {"timestamp": {"$gte": start, "$lt": start + timedelta(hours=hours)}},
+        projection={"_id": 0, "timestamp": 1, "new_price": 1}
+    ).sort("timestamp", 1).batch_size(STREAM_BATCH)
+    for seconds, price in stream(cursor, (lambda doc: epoch(doc["timestamp"]), lambda doc: doc["new_price"])):
+        times.append(seconds)
+        prices.append(price)
+    if not times:
+        return np.full(hours, last), last
+
+    times = np.concatenate(times)
+    prices = np.concatenate(([last], np.concatenate(prices)))
+    ends = origin + HOUR * np.arange(1, hours + 1)
+    return prices[np.searchsorted(times, ends, side="left")], last
+
+
+def replay(params, metrics: dict, supply: float, opening: float, noise):
+    """Price path for every parameter set, shape (sets, hours)
+
+    ``params`` has one row per set in PARAMETERS order. Without the floor the
+    formula is a cumulative sum of hourly steps; with it, each path is that
+    sum reflected at the floor (Lindley's recursion), so no hourly loop is
+    needed.
+    """
+    activity, volume, posts, reviews, demand_weight, supply_weight, whale_bump, floor = params.T
+
+    scores = np.stack([
+        np.minimum(metrics["tx"] / ACTIVITY_SCALE, 1.0),
+        np.minimum(metrics["volume"] / VOLUME_SCALE, 1.0),
+        metrics["posts"],
+        metrics["reviews"]
+    ])
+    demand = np.stack([activity, volume, posts, reviews], axis=1) @ scores
+    whale = (metrics["whales"] > 0).astype(float)
+
+    steps = (demand * demand_weight[:, None]
+             - (supply * supply_weight)[:, None]
+             + whale[None, :] * whale_bump[:, None]
+             + noise[None, :])
+
+    # Distance above the floor: W_t = max(0, W_t-1 + step_t)
+    level = np.cumsum(steps, axis=1) + np.maximum(opening - floor, 0)[:, None]
+    lowest = np.minimum.accumulate(level, axis=1)
+    return level - np.minimum(lowest, 0) + floor[:, None]
+
+
+def summarize(paths):
+    """Final price, range, hourly and daily log-return volatility, max drawdown"""
+    logs = np.log(np.maximum(paths, 1e-12))
+    returns = np.diff(logs, axis=1)
+    daily = np.diff(logs[:, ::24], axis=1)
+    peaks = np.maximum.accumulate(paths, axis=1)
+    return {
+        "final": paths[:, -1],
+        "low": paths.min(axis=1),
+        "high": paths.max(axis=1),
+        "hourly_vol": returns.std(axis=1) if returns.shape[1] else np.zeros(len(paths)),
+        "daily_vol": daily.std(axis=1) if daily.shape[1] else np.zeros(len(paths)),
+        "max_drawdown": (1 - paths / peaks).max(axis=1)
+    }
+
+
+def parameter_grid(overrides: list):
+    """Live parameters first, then every combination of the overrides"""
+    options = {name: [value] for name, value in PARAMETERS.items()}
+    for override in overrides:
+        name, _, values = override.partition("=")
+        if name not in PARAMETERS:
+            raise SystemExit(f"Unknown parameter {name}, expected one of {', '.join(PARAMETERS)}")
+        options[name] = [float(value) for value in values.split(",")]
+
+    live = tuple(PARAMETERS.values())
+    sets = [live] + [combo for combo in itertools.product(*options.values()) if combo != live]
+    return np.asarray(sets, dtype=float)
+
+
+def print_report(params, stats, actual, start: datetime, hours: int):
+    names = list(PARAMETERS)
+    varied = [i for i in range(len(names)) if len(set(params[:, i])) > 1]
+    print(f"Replayed {hours:,} hours from {start:%Y-%m-%d %H:%M} UTC for {len(params):,} parameter sets\n")
+
+    header = "".join(f"{names[i]:>16}" for i in varied) + f"{'final':>12}{'low':>10}{'high':>10}{'vol/h':>9}{'vol/d':>9}{'max dd':>9}"
+    print(f"{'set':>5}" + header)
+    print("-" * (5 + len(header)))
+    rows = [("actual", None)] + [(str(i) if i else "live", i) for i in range(len(params))]
+    for label, i in rows:
+        if i is None:
+            values = "".join(f"{'':>16}" for _ in varied)
+            s = {key: value[0] for key, value in summarize(actual[None, :]).items()}
+        else:
+            values = "".join(f"{params[i, j]:>16g}" for j in varied)
+            s = {key: value[i] for key, value in stats.items()}
+        print(f"{label:>5}{values}{s['final']:>12.4f}{s['low']:>10.4f}{s['high']:>10.4f}"
+              f"{s['hourly_vol']:>9.4f}{s['daily_vol']:>9.4f}{s['max_drawdown']:>9.1%}")
+
+
+def write_paths(path: str, params, paths, actual, start: datetime):
+    with open(path, "w") as f:
+        f.write("hour,actual," + ",".join(f"set{i}" for i in range(len(params))) + "\n")
+        for hour in range(paths.shape[1]):
+            timestamp = start + timedelta(hours=hour + 1)
+            f.write(f"{timestamp:%Y-%m-%dT%H:%M},{actual[hour]:.6f}," + ",".join(f"{p:.6f}" for p in paths[:, hour]) + "\n")
+
+
+def main(args):
+    if np is None:
+        sys.exit("The backtester needs numpy: pip install numpy")
+
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+    hours = args.days * 24
+    db = MongoClient(args.mongo_uri)[args.db]
+
+    metrics = load_ledger(db, start, hours)
+    metrics["posts"] = load_posts(db, start, hours)
+    metrics["reviews"] = load_reviews(db, start, hours)
+    actual, opening = load_prices(db, start, hours)
+
+    if args.supply is not None:
+        supply = args.supply
+    else:
+        # Supply history is not recorded; hold today's counter constant
+        state = db.treasury.find_one({"_id": "supply"})
+        supply = state["circulating"] if state else 0
+
+    params = parameter_grid(args.grid)
+    noise = np.random.default_rng(args.seed).uniform(-args.noise, args.noise, hours) if args.noise else np.zeros(hours)
+    paths = replay(params, metrics, supply, opening, noise)
+
+    print_report(params, summarize(paths), actual, start, hours)
+    if args.paths:
+        write_paths(args.paths, params, paths, actual, start)
+        print(f"\nPrice paths written to {args.paths}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="rcn_prime")
+    parser.add_argument("--days", type=int, default=90, help="history to replay, ending at the last full hour")
+    parser.add_argument("--grid", nargs="*", default=[], metavar="NAME=V1,V2",
+                        help=f"values to try per parameter: {', '.join(PARAMETERS)}")
+    parser.add_argument("--supply", type=float, help="circulating supply to assume (default: current counter)")
+    parser.add_argument("--noise", type=float, default=0.01, help="amplitude of the uniform hourly noise, 0 to disable")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--paths", help="CSV file to write every hourly price path to")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,68 @@
+import time
+from types import SimpleNamespace
+
+
+class FakeUser:
+    """Just enough of ``discord.User`` for the command callbacks"""
+
+    def __init__(self, user_id: int, name: str = None, bot: bool = False):
+        self.id = user_id
+        self.name = name or f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.bot = bot
+        self.display_avatar = SimpleNamespace(url=f"https://cdn.discordapp.com/embed/avatars/{user_id % 5}.png")
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def defer(self, **kwargs):
+        self.interaction.mark_response()
+
+    async def send_message(self, content=None, **kwargs):
+        self.interaction.mark_response()
+        self.interaction.messages.append(content or kwargs.get("embed"))
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        self.interaction.messages.append(content or kwargs.get("embed"))
+
+
+class FakeInteraction:
+    """Stand-in for ``discord.Interaction`` that never touches Discord
+
+    Records when the first response (defer or message) was sent, so the
+    harness can report time-to-ack separately from total latency.
+    """
+
+    def __init__(self, bot, user: FakeUser, channel_id: int = 0):
+        self.client = bot
+        self.user = user
+        self.guild = None
+        self.channel = None
+        self.channel_id = channel_id
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.messages = []
+        self.extras = {}
+        self.command = None
+        self.started = time.perf_counter()
+        self.acked = None
+
+    def mark_response(self):
+        self.response.done = True
+        if self.acked is None:
+            self.acked = time.perf_counter()
+
+    async def edit_original_response(self, content=None, **kwargs):
+        self.messages.append(content or kwargs.get("embed"))
@@ -0,0 +1,355 @@
+"""Load test the economy and post commands without Discord
+
+Builds a real ``RCNPrime`` against a scratch database, loads the cogs and
+calls the command callbacks directly with fake interactions, so app command
+checks (cooldowns, permissions) are not exercised. Each command runs as its
+own phase so Mongo round trips can be attributed to it.
+
+    python -m bench.load_test --users 5000 --ops 20000 --concurrency 500
+    python -m bench.load_test --memory            # mongomock-motor, no mongod
+    python -m bench.load_test --save-baseline     # write bench/baseline.json
+
+Without ``--save-baseline`` the run is compared against the saved baseline
+and exits non-zero when a command regressed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from pymongo import monitoring
+from pymongo.errors import OperationFailure
+
+from bench.fakes import FakeInteraction, FakeUser
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+SCENARIOS = ("wallet", "pay", "post", "airdrop")
+START_BALANCE = 1_000_000
+# Relative slowdown in p95 or throughput tolerated before a command counts as regressed
+DEFAULT_TOLERANCE = 0.25
+
+logger = logging.getLogger('RCN_Prime')
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts every command the driver sends to Mongo, by command name"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def started(self, event):
+        self.counts[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def total(self):
+        return sum(self.counts.values())
+
+
+class CountingCollection:
+    """Collection proxy counting each driver call as one round trip
+
+    mongomock never goes through pymongo's monitoring, so in ``--memory``
+    mode calls are counted at the collection API instead.
+    """
+
+    def __init__(self, collection, counter: RoundTripCounter):
+        self.collection = collection
+        self.counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+        if name == "database":
+            return CountingDatabase(attr, self.counter)
+        if name == "with_options":
+            return lambda *args, **kwargs: CountingCollection(attr(*args, **kwargs), self.counter)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self.counter.counts[name] += 1
+            return attr(*args, **kwargs)
+        return call
+
+
+class CountingDatabase:
+    def __init__(self, db, counter: RoundTripCounter):
+        self.db = db
+        self.counter = counter
+
+    def __getitem__(self, name):
+        return CountingCollection(self.db[name], self.counter)
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if hasattr(attr, "insert_one"):
+            return CountingCollection(attr, self.counter)
+        return attr
+
+
+class CountingClient:
+    """mongomock-motor client whose collections count their calls"""
+
+    def __init__(self, client, counter: RoundTripCounter):
+        self.client = client
+        self.counter = counter
+
+    def __getitem__(self, name):
+        return CountingDatabase(self.client[name], self.counter)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def start_session(self, **kwargs):
+        # Like a standalone mongod: callers fall back to writes without a transaction
+        raise OperationFailure("mongomock does not support transactions", code=20)
+
+
+@contextmanager
+def in_memory_motor(counter: RoundTripCounter):
+    """Make ``RCNPrime`` build a counting mongomock-motor client instead of a real one"""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("--memory needs mongomock-motor: pip install mongomock-motor")
+
+    import motor.motor_asyncio
+    original = motor.motor_asyncio.AsyncIOMotorClient
+    motor.motor_asyncio.AsyncIOMotorClient = lambda *args, **kwargs: CountingClient(AsyncMongoMockClient(), counter)
+    try:
+        yield
+    finally:
+        motor.motor_asyncio.AsyncIOMotorClient = original
+
+
+async def build_bot(args, counter: RoundTripCounter):
+    if args.db == "rcn_prime":
+        sys.exit("Refusing to benchmark against the production database name")
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB"] = args.db
+
+    from bot import RCNPrime
+    if args.memory:
+        with in_memory_motor(counter):
+            bot = RCNPrime()
+    else:
+        monitoring.register(counter)
+        bot = RCNPrime()
+
+    await bot.client.drop_database(args.db)
+    bot.ledger.start()
+    try:
+        await bot.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Skipping index setup: {e}")
+    for extension in ("cogs.economy", "cogs.posts", "cogs.founder"):
+        await bot.load_extension(extension)
+    return bot
+
+
+async def seed_users(bot, count: int):
+    """Verified users with enough RC that pays never bounce"""
+    users = [FakeUser(10_000 + i) for i in range(count)]
+    docs = []
+    for user in users:
+        doc = bot.new_user_document(user.id, user.name)
+        doc["rc_balance"] = START_BALANCE
+        doc["verification_status"] = "verified"
+        docs.append(doc)
+    for start in range(0, len(docs), 1000):
+        await bot.users_col.insert_many(docs[start:start + 1000], ordered=False)
+    return users
+
+
+def scenario(bot, name: str, users: list):
+    """Coroutine factory for one invocation of the named command"""
+    economy = bot.get_cog("EconomyCog")
+    posts = bot.get_cog("PostsCog")
+    founder = bot.get_cog("FounderCog")
+
+    if name == "wallet":
+        async def op(i):
+            interaction = FakeInteraction(bot, random.choice(users))
+            await economy.wallet.callback(economy, interaction)
+            return interaction
+    elif name == "pay":
+        async def op(i):
+            sender, recipient = random.sample(users, 2)
+            interaction = FakeInteraction(bot, sender)
+            await economy.pay.callback(economy, interaction, recipient, random.randint(1, 100))
+            return interaction
+    elif name == "post":
+        async def op(i):
+            interaction = FakeInteraction(bot, random.choice(users))
+            await posts.post.callback(
+                posts, interaction, random.choice(["hiring", "forhire"]),
+                f"Benchmark post {i}", "Load test post body", "Scripter, Builder", "100-500 RC"
+            )
+            return interaction
+    elif name == "airdrop":
+        async def op(i):
+            interaction = FakeInteraction(bot, FakeUser(bot.FOUNDER_ID, "founder"))
+            await founder.founder_event.callback(founder, interaction, f"Benchmark airdrop {i}", 1)
+            return interaction
+    else:
+        raise ValueError(f"Unknown scenario {name}")
+    return op
+
+
+def percentile(values: list, pct: float):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def drain_ledger(bot):
+    """Wait until queued ledger entries have been written"""
+    while not bot.ledger.queue.empty():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(bot.ledger.flush_interval * 2)
+
+
+async def run_phase(bot, name: str, op, ops: int, concurrency: int, counter: RoundTripCounter):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, acks = [], []
+    errors = Counter()
+
+    async def invoke(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                interaction = await op(i)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            if interaction.acked is not None:
+                acks.append(interaction.acked - start)
+
+    await drain_ledger(bot)
+    before = counter.total()
+    handled_before = sum(bot.perf.errors.values())
+    start = time.perf_counter()
+    await asyncio.gather(*(invoke(i) for i in range(ops)))
+    elapsed = time.perf_counter() - start
+    await drain_ledger(bot)
+    round_trips = counter.total() - before
+
+    # Commands catch their own failures, log them through perf.error and reply
+    # with an error message, so those never reach invoke()
+    handled = sum(bot.perf.errors.values()) - handled_before
+    if handled:
+        errors["handled"] += handled
+    succeeded = len(latencies) - handled
+
+    return {
+        "ops": ops,
+        "errors": dict(errors),
+        "seconds": round(elapsed, 3),
+        "throughput": round(succeeded / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "ack_p95_ms": round(percentile(acks, 95) * 1000, 2),
+        # Includes background writes (ledger, supply) the phase caused
+        "round_trips_per_op": round(round_trips / ops, 2)
+    }
+
+
+def print_report(results: dict):
+    header = f"{'command':<10}{'ops':>8}{'err':>6}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ack p95':>10}{'trips/op':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<10}{r['ops']:>8}{sum(r['errors'].values()):>6}{r['throughput']:>10.1f}"
+              f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['ack_p95_ms']:>10.2f}{r['round_trips_per_op']:>10.2f}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """Regressions against the baseline, one message per command and metric"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {r['p95_ms']}ms")
+        if base["throughput"] and r["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput']} -> {r['throughput']} ops/s")
+        if base.get("round_trips_per_op") and r["round_trips_per_op"] and r["round_trips_per_op"] > base["round_trips_per_op"] + 0.5:
+            regressions.append(f"{name}: round trips/op {base['round_trips_per_op']} -> {r['round_trips_per_op']}")
+    return regressions
+
+
+async def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    random.seed(args.seed)
+    counter = RoundTripCounter()
+    bot = await build_bot(args, counter)
+    results = {}
+    try:
+        users = await seed_users(bot, args.users)
+        for name in args.commands:
+            ops = args.airdrops if name == "airdrop" else args.ops
+            results[name] = await run_phase(bot, name, scenario(bot, name, users), ops, args.concurrency, counter)
+        print_report(results)
+    finally:
+        try:
+            await bot.close()
+        except Exception as e:
+            logger.error(f"Error closing bot: {e}")
+        if not args.keep:
+            await bot.client.drop_database(args.db)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"users": args.users, "concurrency": args.concurrency, "commands": results}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline to compare against, run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["commands"], args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against baseline")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="rcn_bench", help="scratch database, dropped before and after the run")
+    parser.add_argument("--memory", action="store_true", help="use mongomock-motor instead of mongod")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=5000, help="invocations per command")
+    parser.add_argument("--airdrops", type=int, default=3, help="founder airdrops to run")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--commands", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database for inspection")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -1,31 +1,109 @@
 import os
 import discord
+from discord import app_commands
 from discord.ext import commands
 import motor.motor_asyncio
+from pymongo import IndexModel, UpdateOne, ReturnDocument, ASCENDING, DESCENDING, TEXT
 from datetime import datetime
 import asyncio
+import hashlib
+import json
 import logging
+import random
+import time
+
+from core.airdrop import AirdropEngine
+from core.cache import TTLCache
+from core.candles import CandleRollup
+from core.cooldowns import CooldownEngine
+from core.expiry import ExpiryScheduler
+from core.leaderboard import LeaderboardService
+from core.lease import LeaseManager
+from core.missions import WeeklyMissionJob
+from core.mission_tracker import MissionTracker
+from core.perf import PerfRegistry, TimedCommandTree
+from core.price_buffer import PriceBuffer
+from core.scam_graph import RingDetector
+from core.anomaly import AnomalyDetector
+from core.sender import ChannelSender
+from core.skills import skill_mask
+from core.trust import TrustService
+from core.ledger import LedgerWriter
+from core.market import RollingMarketWindow, CHECKPOINT_INTERVAL
+from core.metrics import MarketSnapshot, collect_market_snapshot, next_price
+
+COGS = [
+    'cogs.economy',
+    'cogs.posts',
+    'cogs.reviews',
+    'cogs.scam',
+    'cogs.missions',
+    'cogs.store',
+    'cogs.profiles',
+    'cogs.admin',
+    'cogs.founder'
+]
+
+# Seconds between refreshes of the price and supply other processes write
+SHARED_STATE_INTERVAL = 15
+
+# Index options that make two indexes on the same keys different
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('RCN_Prime')
 
-class RCNPrime(commands.Bot):
+
+def index_spec(document: dict):
+    """(keys, options) of an index, comparable between IndexModel and index_information"""
+    key = document["key"]
+    keys, text_fields = [], list(document.get("weights", {}))
+    for field, direction in (key.items() if isinstance(key, dict) else key):
+        if field in ("_fts", "_ftsx"):
+            continue
+        if direction == "text":
+            text_fields.append(field)
+        else:
+            keys.append((field, int(direction) if isinstance(direction, (int, float)) else direction))
+    if text_fields:
+        keys.append(("$text", tuple(sorted(set(text_fields)))))
+    options = tuple(
+        (option, json.dumps(document[option], sort_keys=True, default=str))
+        for option in INDEX_OPTIONS if option in document
+    )
+    return tuple(keys), options
+
+class RCNPrime(commands.AutoShardedBot):
     def __init__(self):
         intents = discord.Intents.all()
+        
+        # Unset runs every shard in this process; SHARD_IDS splits them across processes
+        shard_count = os.getenv('SHARD_COUNT', '')
+        shard_ids = os.getenv('SHARD_IDS', '')
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None
+            help_command=None,
+            tree_cls=TimedCommandTree,
+            shard_count=int(shard_count) if shard_count.isdigit() else None,
+            shard_ids=[int(shard_id) for shard_id in shard_ids.split(',')] if shard_ids else None
         )
+        # Other processes serve the remaining shards and share state through Mongo
+        self.multi_process = bool(shard_ids)
         
         # Founder ID - The Satoshi of RCredits
         self.FOUNDER_ID = 1351116002380746865
         
+        # Command, Mongo and background task latency
+        self.perf = PerfRegistry()
+        metrics_port = os.getenv('PERF_METRICS_PORT', '')
+        self.metrics_port = int(metrics_port) if metrics_port.isdigit() else None
+        
         # Database setup
         self.mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
-        self.client = motor.motor_asyncio.AsyncIOMotorClient(self.mongo_uri)
-        self.db = self.client.rcn_prime
+        self.client = motor.motor_asyncio.AsyncIOMotorClient(self.mongo_uri, event_listeners=[self.perf.listener])
+        self.db = self.client[os.getenv('MONGO_DB', 'rcn_prime')]
         
         # Collections
         self.users_col = self.db.users
@@ -37,234 +115,664 @@ class RCNPrime(commands.Bot):
         self.store_col = self.db.store
         self.price_history_col = self.db.price_history
         self.treasury_col = self.db.treasury
+        self.airdrops_col = self.db.airdrops
+        self.market_state_col = self.db.market_state
+        self.price_candles_col = self.db.price_candles
+        self.cooldowns_col = self.db.cooldowns
+        self.bot_state_col = self.db.bot_state
+        self.leases_col = self.db.leases
+        
+        # Index registry, reconciled at startup by ensure_indexes
+        self.index_registry = {
+            self.transactions_col: [
+                IndexModel([("timestamp", ASCENDING)], name="timestamp"),
+                IndexModel([("type", ASCENDING), ("timestamp", ASCENDING)], name="type_timestamp"),
+                IndexModel([("type", ASCENDING), ("amount", ASCENDING), ("timestamp", ASCENDING)], name="type_amount_timestamp"),
+                IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_timestamp")
+            ],
+            self.posts_col: [
+                IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+                IndexModel([("status", ASCENDING), ("expires_at", ASCENDING)], name="status_expires_at"),
+                # Equality fields, then the keyset sort, then the $bitsAllSet skill filter
+                IndexModel([("status", ASCENDING), ("type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING), ("skill_mask", ASCENDING)], name="search"),
+                IndexModel([("title", TEXT), ("description", TEXT)], name="search_text")
+            ],
+            self.reviews_col: [
+                IndexModel([("created_at", ASCENDING)], name="created_at"),
+                IndexModel([("target_id", ASCENDING), ("created_at", DESCENDING)], name="target_created_at")
+            ],
+            self.price_history_col: [
+                IndexModel([("timestamp", ASCENDING)], name="timestamp")
+            ],
+            self.price_candles_col: [
+                IndexModel([("resolution", ASCENDING), ("start", ASCENDING)], name="resolution_start")
+            ],
+            self.users_col: [
+                IndexModel([("verification_status", ASCENDING), ("_id", ASCENDING)], name="verification_status"),
+                IndexModel([("mission_completions.day", ASCENDING)], name="mission_day")
+            ],
+            self.store_col: [
+                IndexModel([("active", ASCENDING), ("expires_at", ASCENDING)], name="active_expires_at")
+            ],
+            self.cooldowns_col: [
+                IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+            ],
+            self.airdrops_col: [
+                IndexModel([("status", ASCENDING)], name="status")
+            ]
+        }
+        
+        # Production refuses to start with missing indexes instead of building them
+        self.production = os.getenv('RCN_ENV', 'development') == 'production'
+        
+        # Bulk airdrop engine
+        self.airdrops = AirdropEngine(self)
+        
+        # User documents, invalidated by every balance mutation
+        self.user_cache = TTLCache()
+        
+        # OHLC candles over price_history
+        self.candles = CandleRollup(self)
+        self.price_history_timeseries = os.getenv('PRICE_HISTORY_TIMESERIES', '').lower() in ('1', 'true', 'yes')
+        
+        # Posts channel and paced publishing for bulk announcements
+        posts_channel_id = os.getenv('POSTS_CHANNEL_ID', '')
+        self.posts_channel_id = int(posts_channel_id) if posts_channel_id.isdigit() else None
+        self.sender = ChannelSender(self)
+        
+        # Scam log channel for automated abuse reports
+        scam_log_channel_id = os.getenv('SCAM_LOG_CHANNEL_ID', '')
+        self.scam_log_channel_id = int(scam_log_channel_id) if scam_log_channel_id.isdigit() else None
         
-        # Current RC price
+        # Deadline-driven expiry for posts and timed store items
+        self.expiry = ExpiryScheduler(self)
+        self.expiry.register("post", self.posts_col, {"status": "active"}, {"$set": {"status": "expired"}})
+        self.expiry.register("store_item", self.store_col, {"active": True}, {"$set": {"active": False}})
+        
+        # Per-user command rate limits from config.COOLDOWNS; shared through
+        # Mongo by default when several processes serve the same users
+        cooldown_shared = os.getenv('COOLDOWN_SHARED', '')
+        self.cooldowns = CooldownEngine(
+            self,
+            shared=cooldown_shared.lower() in ('1', 'true', 'yes') if cooldown_shared else self.multi_process
+        )
+        
+        # Ranked views of users, maintained incrementally
+        self.leaderboards = LeaderboardService(self)
+        
+        # Reviews and trust scores
+        self.trust = TrustService(self)
+        
+        # Transfer-graph abuse detection
+        self.ring_detector = RingDetector(self)
+        self.anomalies = AnomalyDetector(
+            self,
+            block=os.getenv('ANOMALY_BLOCK', '').lower() in ('1', 'true', 'yes')
+        )
+        
+        # Daily mission progress and weekly mission awards
+        self.mission_tracker = MissionTracker(self)
+        self.weekly_missions = WeeklyMissionJob(self)
+        
+        # Singleton background jobs run in whichever process holds their lease
+        self.leases = LeaseManager(self)
+        
+        # Write-behind transaction ledger
+        self.ledger = LedgerWriter(self.transactions_col)
+        
+        # Rolling 24h ledger counters, fed by log_transaction
+        self.market = RollingMarketWindow()
+        self.market_ready = False
+        self.failed_cogs = []
+        
+        # Circulating RC, mirrored from the treasury "supply" document
+        self.circulating_supply = 0
+        
+        # Current RC price, restored from price_history at startup
         self.current_rc_price = 0.03  # 1000 RC = 30 Robux
+        self.price_buffer = PriceBuffer()
         self.volatility = 0.02
         
     async def setup_hook(self):
         """Initialize bot and load cogs"""
-        # Load all cogs
-        cogs = [
-            'cogs.economy',
-            'cogs.posts', 
-            'cogs.reviews',
-            'cogs.scam',
-            'cogs.missions',
-            'cogs.store',
-            'cogs.profiles',
-            'cogs.admin',
-            'cogs.founder'
-        ]
+        started = time.perf_counter()
+        timings = {}
+        
+        async def timed(step, coro):
+            step_started = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[step] = time.perf_counter() - step_started
         
-        for cog in cogs:
+        self.ledger.start()
+        self.tree.on_error = self.on_app_command_error
+        
+        # None of these depend on each other, so run them side by side
+        steps = {
+            "indexes": self.prepare_collections(),
+            "treasury": self.init_treasury(),
+            "supply": self.init_supply(),
+            "price": self.hydrate_price(),
+            "candles": self.candles.backfill(),
+            "cogs": self.load_cogs(),
+            "missions": self.mission_tracker.load(),
+            "market": self.restore_market(),
+            "skill_masks": self.backfill_skill_masks()
+        }
+        if not self.cooldowns.shared:
+            steps["cooldowns"] = self.cooldowns.load()
+        await asyncio.gather(*(timed(step, coro) for step, coro in steps.items()))
+        
+        if not self.cooldowns.shared:
+            self.loop.create_task(self.cooldowns.run())
+        self.loop.create_task(self.mission_tracker.run())
+        
+        # Per-process background tasks
+        self.loop.create_task(self.leaderboards.run())
+        if self.multi_process:
+            self.loop.create_task(self.shared_state_loop())
+        else:
+            self.loop.create_task(self.market_checkpoint_loop())
+        
+        # Jobs that must run exactly once across all processes
+        self.leases.exclusive("price_engine", self.price_fluctuation_engine)
+        self.leases.exclusive("expiry", self.expiry.run)
+        self.leases.exclusive("airdrops", self.airdrops.watch)
+        self.leases.exclusive("supply_reconciliation", self.supply_reconciliation_loop)
+        self.leases.exclusive("weekly_missions", self.weekly_missions.run)
+        self.leases.exclusive("trust", self.trust.run)
+        self.leases.exclusive("ring_detector", self.ring_detector.run)
+        if self.metrics_port:
+            self.loop.create_task(self.perf.serve(self.metrics_port))
+        
+        await timed("sync", self.sync_commands())
+        
+        breakdown = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in sorted(timings.items(), key=lambda item: -item[1]))
+        logger.info(f"🚀 Ready in {time.perf_counter() - started:.2f}s ({breakdown})")
+    
+    async def prepare_collections(self):
+        """Create time-series collections, then make sure every query has its index"""
+        if self.price_history_timeseries:
+            await self.candles.ensure_timeseries()
+        await self.ensure_indexes()
+    
+    async def load_cogs(self):
+        """Load every extension concurrently; a broken cog doesn't stop the rest"""
+        async def load(cog):
             try:
                 await self.load_extension(cog)
                 logger.info(f'✅ Loaded cog: {cog}')
             except Exception as e:
                 logger.error(f'❌ Failed to load {cog}: {e}')
+                self.failed_cogs.append(cog)
         
-        # Start background tasks
-        self.loop.create_task(self.price_fluctuation_engine())
-        self.loop.create_task(self.cleanup_expired_posts())
-        
-        # Initialize treasury
-        await self.init_treasury()
+        await asyncio.gather(*(load(cog) for cog in COGS))
+    
+    async def restore_market(self):
+        """Rebuild market counters before the price engine reads them"""
+        try:
+            await self.market.restore(self)
+            self.market_ready = True
+        except Exception as e:
+            logger.error(f"Failed to restore market window: {e}")
+    
+    async def backfill_skill_masks(self):
+        """Give posts created before skill masks existed a mask"""
+        try:
+            ops = []
+            async for post in self.posts_col.find({"skill_mask": {"$exists": False}}, projection={"skills": 1}):
+                ops.append(UpdateOne({"_id": post["_id"]}, {"$set": {"skill_mask": skill_mask(post.get("skills", []))}}))
+            if ops:
+                await self.posts_col.bulk_write(ops, ordered=False)
+                logger.info(f"🏷️ Backfilled skill masks on {len(ops)} posts")
+        except Exception as e:
+            logger.error(f"Failed to backfill post skill masks: {e}")
+    
+    async def sync_commands(self):
+        """Sync the command tree, skipping it when no command signature changed"""
+        if self.failed_cogs:
+            # Syncing now would unregister the failed cogs' commands until the next restart
+            logger.warning(f"⏭️ Skipping command sync, failed to load: {', '.join(self.failed_cogs)}")
+            return
+        try:
+            signatures = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+            digest = hashlib.sha256(json.dumps(signatures, sort_keys=True, default=str).encode()).hexdigest()
+            
+            state = await self.bot_state_col.find_one({"_id": "command_tree"})
+            if state and state.get("hash") == digest:
+                logger.info("⏭️ Command tree unchanged, skipping sync")
+                return
+            
+            synced = await self.tree.sync()
+            await self.bot_state_col.update_one(
+                {"_id": "command_tree"},
+                {"$set": {"hash": digest, "synced_at": datetime.utcnow()}},
+                upsert=True
+            )
+            logger.info(f"🔄 Synced {len(synced)} application commands")
+        except Exception as e:
+            logger.error(f"Failed to sync application commands: {e}")
+    
+    async def close(self):
+        """Flush pending writes before disconnecting"""
+        try:
+            await self.ledger.close()
+            try:
+                await self.cooldowns.flush()
+            except Exception as e:
+                logger.error(f"Error flushing cooldowns: {e}")
+            try:
+                await self.mission_tracker.flush()
+            except Exception as e:
+                logger.error(f"Error flushing mission progress: {e}")
+            if self.market_ready and not self.multi_process:
+                try:
+                    await self.market.checkpoint(self)
+                except Exception as e:
+                    logger.error(f"Error checkpointing market window: {e}")
+            await self.leases.release_all()
+            await self.perf.close()
+        finally:
+            if getattr(self, "_AutoShardedClient__queue", None) is None:
+                # Never connected (login failed, or built by a harness): the
+                # sharded close posts to the event queue connect() creates
+                self._AutoShardedClient__queue = asyncio.PriorityQueue()
+            await super().close()
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self.perf.finish(interaction)
+    
+    async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Report failed checks to the user instead of failing silently"""
+        self.perf.finish(interaction)
+        if not isinstance(error, app_commands.CheckFailure):
+            self.perf.errors[interaction.command.qualified_name if interaction.command else '?'] += 1
+        if isinstance(error, app_commands.CommandOnCooldown):
+            message = f"⏳ Slow down! Try again <t:{int(datetime.utcnow().timestamp() + error.retry_after)}:R>."
+        else:
+            logger.error(f"Error in /{interaction.command.name if interaction.command else '?'}: {error}", exc_info=error)
+            message = "❌ An error occurred."
         
+        if interaction.response.is_done():
+            await interaction.followup.send(message, ephemeral=True)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
+    
+    async def ensure_indexes(self):
+        """Reconcile the index registry with the database
+
+        Indexes are matched on keys and options, so one created by hand under
+        another name counts as present. An index whose name or keys clash with
+        a registry entry but which differs from it is dropped and rebuilt.
+        """
+        for collection, indexes in self.index_registry.items():
+            existing = {
+                name: index_spec(info)
+                for name, info in (await collection.index_information()).items()
+                if name != "_id_"
+            }
+            present = {spec: name for name, spec in existing.items()}
+            missing, stale = [], set()
+            for index in indexes:
+                name = index.document["name"]
+                spec = index_spec(index.document)
+                if spec in present:
+                    if present[spec] != name:
+                        logger.info(f"Index {name} on {collection.name} exists as {present[spec]}")
+                    continue
+                missing.append(index)
+                stale.update(
+                    other for other, (keys, _) in existing.items()
+                    if other == name or keys == spec[0]
+                )
+            if not missing:
+                continue
+            
+            names = ', '.join(index.document["name"] for index in missing)
+            if self.production:
+                raise RuntimeError(f"Missing or outdated indexes on {collection.name}: {names}")
+            
+            for name in stale:
+                logger.info(f"🗑️ Dropping outdated index {name} on {collection.name}")
+                await collection.drop_index(name)
+            logger.info(f"🔨 Building indexes on {collection.name}: {names}")
+            await collection.create_indexes(missing)
+    
+    async def report_scam(self, title: str, description: str):
+        """Post an automated report to the scam log channel"""
+        if not self.scam_log_channel_id:
+            return
+        embed = discord.Embed(
+            title=title,
+            description=description[:4000],
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow()
+        )
+        self.sender.publish(self.scam_log_channel_id, embed)
+    
     async def init_treasury(self):
         """Initialize treasury if not exists"""
-        treasury = await self.treasury.find_one({"_id": "main"})
+        treasury = await self.treasury_col.find_one({"_id": "main"})
         if not treasury:
-            await self.treasury.insert_one({
+            await self.treasury_col.insert_one({
                 "_id": "main",
                 "balance": 0,
                 "total_tax_collected": 0,
                 "created_at": datetime.utcnow()
             })
     
+    async def init_supply(self):
+        """Load the circulating supply counter, seeding it from a full scan once"""
+        supply = await self.treasury_col.find_one({"_id": "supply"})
+        if not supply:
+            circulating = await self.scan_circulating_supply()
+            supply = {
+                "_id": "supply",
+                "circulating": circulating,
+                "founder_minted": 0,
+                "updated_at": datetime.utcnow()
+            }
+            await self.treasury_col.update_one({"_id": "supply"}, {"$setOnInsert": supply}, upsert=True)
+            logger.info(f"🪙 Seeded supply counter: {circulating:,} RC")
+        self.circulating_supply = supply["circulating"]
+    
+    async def record_supply_change(self, circulating: float = 0, minted: float = 0, tax: float = 0):
+        """Apply a mint, burn or tax to the supply counter and treasury in one round trip
+
+        circulating is the net change in RC held by non-founder users, minted is
+        the amount issued from the founder's reserve and tax is the amount moved
+        into the treasury.
+        """
+        ops = self.supply_ops(circulating, minted, tax)
+        if ops:
+            await self.treasury_col.bulk_write(ops, ordered=False)
+        self.circulating_supply += circulating
+    
+    def supply_ops(self, circulating: float = 0, minted: float = 0, tax: float = 0):
+        """Treasury writes for a supply change, for callers batching them with other writes"""
+        now = datetime.utcnow()
+        ops = []
+        if circulating or minted:
+            ops.append(UpdateOne(
+                {"_id": "supply"},
+                {"$inc": {"circulating": circulating, "founder_minted": minted}, "$set": {"updated_at": now}},
+                upsert=True
+            ))
+        if tax:
+            ops.append(UpdateOne(
+                {"_id": "main"},
+                {"$inc": {"balance": tax, "total_tax_collected": tax}}
+            ))
+        return ops
+    
+    async def scan_circulating_supply(self):
+        """Sum every non-founder balance with a full scan on the primary"""
+        users = self.users_col
+        pipeline = [
+            {"$match": {"is_founder": {"$ne": True}}},
+            {"$group": {"_id": None, "total_rc": {"$sum": "$rc_balance"}}}
+        ]
+        result = await users.aggregate(pipeline).to_list(length=1)
+        return result[0]['total_rc'] if result else 0
+    
+    async def supply_reconciliation_loop(self):
+        """Verify the supply counter against a full scan every six hours"""
+        await self.wait_until_ready()
+        
+        while not self.is_closed():
+            await asyncio.sleep(6 * 3600)
+            with self.perf.tick("supply_reconciliation"):
+                try:
+                    await self.reconcile_supply()
+                except Exception as e:
+                    logger.error(f"Error reconciling supply: {e}")
+    
+    async def reconcile_supply(self):
+        """Correct the supply counter only when a scan is known to be consistent
+
+        The scan isn't a snapshot, so it is only trusted when the counter didn't
+        move while it ran and a second scan agrees with it. The correction is a
+        compare-and-set on the counter value the scans were checked against.
+        """
+        counted = None
+        scans = []
+        for _ in range(2):
+            before = await self.treasury_col.find_one({"_id": "supply"})
+            scanned = await self.scan_circulating_supply()
+            after = await self.treasury_col.find_one({"_id": "supply"})
+            if before != after:
+                logger.info("Supply changed during reconciliation scan, retrying next cycle")
+                return
+            counted = after["circulating"] if after else 0
+            if scanned == counted:
+                self.circulating_supply = counted
+                return
+            scans.append((scanned, counted))
+        
+        if scans[0] != scans[1]:
+            logger.info("Reconciliation scans disagree, retrying next cycle")
+            return
+        
+        logger.warning(f"Supply counter drift: counter {counted:,} RC, scan {scanned:,} RC; correcting")
+        result = await self.treasury_col.update_one(
+            {"_id": "supply", "circulating": counted},
+            {"$set": {"circulating": scanned, "reconciled_at": datetime.utcnow()}}
+        )
+        if result.modified_count:
+            self.circulating_supply = scanned
+    
     async def price_fluctuation_engine(self):
         """Hourly price fluctuation engine"""
         await self.wait_until_ready()
         
+        # After a restart or failover, finish the hour since the last tick first
+        await self.refresh_shared_state()
+        latest = self.price_buffer.latest_timestamp
+        if latest:
+            await asyncio.sleep(max(0, 3600 - (datetime.utcnow() - latest).total_seconds()))
+        
         while not self.is_closed():
-            try:
-                # Calculate metrics for price fluctuation
-                user_activity = await self.calculate_user_activity()
-                trade_volume = await self.calculate_trade_volume()
-                coin_velocity = await self.calculate_coin_velocity()
-                posts_count = await self.posts.count_documents({"status": "active"})
-                reviews_count = await self.reviews.count_documents({})
-                whale_movement = await self.detect_whale_movement()
-                
-                # Calculate demand metric
-                demand = (user_activity * 0.3 + trade_volume * 0.4 + posts_count * 0.2 + reviews_count * 0.1)
-                
-                # Calculate supply (total minted RC)
-                total_supply = await self.calculate_total_supply()
-                
-                # Whale factor
-                whale_factor = 1 if whale_movement else 0
+            with self.perf.tick("price_engine"):
+                try:
+                    # Ledger metrics come from the rolling window
+                    snapshot = await self.market_snapshot()
+                    demand = snapshot.demand
+                    whale_movement = snapshot.whale_movement
                 
-                # Random volatility (-1% to +1%)
-                import random
-                random_volatility = random.uniform(-0.01, 0.01)
+                    # Random volatility (-1% to +1%)
+                    random_volatility = random.uniform(-0.01, 0.01)
                 
-                # Calculate new price
-                old_price = self.current_rc_price
-                new_price = old_price + (demand * 0.5) - (total_supply * 0.000001) + (whale_factor * 0.8) + random_volatility
+                    # Calculate new price
+                    old_price = self.current_rc_price
+                    new_price = next_price(old_price, snapshot, random_volatility)
                 
-                # Ensure price doesn't go below minimum
-                new_price = max(0.01, new_price)
+                    # Log price change
+                    change_percent = ((new_price - old_price) / old_price) * 100
                 
-                # Update price
-                self.current_rc_price = new_price
+                    # Update price, store in history and roll into candles
+                    await self.record_price(
+                        new_price,
+                        change_percent=change_percent,
+                        demand=demand,
+                        whale_movement=whale_movement
+                    )
                 
-                # Log price change
-                change_percent = ((new_price - old_price) / old_price) * 100
-                
-                # Send to price channel if configured
-                price_channel_id = os.getenv('PRICE_CHANNEL_ID')
-                if price_channel_id:
-                    channel = self.get_channel(int(price_channel_id))
-                    if channel:
-                        embed = discord.Embed(
-                            title="📈 RC Price Update",
-                            color=discord.Color.green() if change_percent >= 0 else discord.Color.red()
-                        )
-                        embed.add_field(name="Old Price", value=f"{old_price:.4f}", inline=True)
-                        embed.add_field(name="New Price", value=f"{new_price:.4f}", inline=True)
-                        embed.add_field(name="Change", value=f"{change_percent:+.2f}%", inline=True)
-                        embed.add_field(name="Demand", value=f"{demand:.2f}", inline=True)
-                        embed.add_field(name="Whale Movement", value="Yes" if whale_movement else "No", inline=True)
+                    # Send to price channel if configured
+                    price_channel_id = os.getenv('PRICE_CHANNEL_ID')
+                    if price_channel_id:
+                        channel = self.get_channel(int(price_channel_id))
+                        if channel:
+                            embed = discord.Embed(
+                                title="📈 RC Price Update",
+                                color=discord.Color.green() if change_percent >= 0 else discord.Color.red()
+                            )
+                            embed.add_field(name="Old Price", value=f"{old_price:.4f}", inline=True)
+                            embed.add_field(name="New Price", value=f"{new_price:.4f}", inline=True)
+                            embed.add_field(name="Change", value=f"{change_percent:+.2f}%", inline=True)
+                            embed.add_field(name="Demand", value=f"{demand:.2f}", inline=True)
+                            embed.add_field(name="Whale Movement", value="Yes" if whale_movement else "No", inline=True)
                         
-                        await channel.send(embed=embed)
-                
-                # Store in history
-                await self.price_history.insert_one({
-                    "timestamp": datetime.utcnow(),
-                    "old_price": old_price,
-                    "new_price": new_price,
-                    "change_percent": change_percent,
-                    "demand": demand,
-                    "whale_movement": whale_movement
-                })
+                            await channel.send(embed=embed)
                 
-                logger.info(f"💰 Price updated: {old_price:.4f} -> {new_price:.4f} ({change_percent:+.2f}%)")
+                    logger.info(f"💰 Price updated: {old_price:.4f} -> {new_price:.4f} ({change_percent:+.2f}%)")
                 
-            except Exception as e:
-                logger.error(f"Error in price engine: {e}")
+                except Exception as e:
+                    logger.error(f"Error in price engine: {e}")
             
             # Wait 1 hour
             await asyncio.sleep(3600)
     
-    async def calculate_user_activity(self):
-        """Calculate user activity metric"""
-        # Count active users in last 24 hours
-        yesterday = datetime.utcnow().timestamp() - 86400
-        active_users = await self.transactions.count_documents({
-            "timestamp": {"$gte": yesterday}
+    async def record_price(self, new_price: float, **details):
+        """Set the current price and persist it as a tick"""
+        old_price = self.current_rc_price
+        tick_time = datetime.utcnow()
+        
+        self.current_rc_price = new_price
+        self.price_buffer.append(tick_time, new_price)
+        
+        await self.price_history_col.insert_one({
+            "timestamp": tick_time,
+            "old_price": old_price,
+            "new_price": new_price,
+            **details
         })
-        return min(active_users / 100, 1.0)  # Normalize to 0-1
+        await self.candles.record(new_price, tick_time)
     
-    async def calculate_trade_volume(self):
-        """Calculate trade volume metric"""
-        yesterday = datetime.utcnow().timestamp() - 86400
-        pipeline = [
-            {"$match": {"type": "trade", "timestamp": {"$gte": yesterday}}},
-            {"$group": {"_id": None, "total_volume": {"$sum": "$amount"}}}
-        ]
-        result = await self.transactions.aggregate(pipeline).to_list(length=1)
-        volume = result[0]['total_volume'] if result else 0
-        return min(volume / 10000, 1.0)  # Normalize
+    async def hydrate_price(self):
+        """Restore recent ticks and the current price from price_history"""
+        await self.price_buffer.hydrate(self)
+        if self.price_buffer.latest is not None:
+            self.current_rc_price = self.price_buffer.latest
+            logger.info(f"💰 Restored price {self.current_rc_price:.6f} from {len(self.price_buffer)} ticks")
     
-    async def calculate_coin_velocity(self):
-        """Calculate coin velocity"""
-        yesterday = datetime.utcnow().timestamp() - 86400
-        trades = await self.transactions.count_documents({
-            "type": "trade", 
-            "timestamp": {"$gte": yesterday}
-        })
-        return min(trades / 50, 1.0)
+    async def market_snapshot(self):
+        """Build price engine inputs from the rolling window"""
+        if not self.market_ready or self.multi_process:
+            # The window only sees this process's transactions (or could not be
+            # restored), so aggregate the whole ledger instead
+            return await collect_market_snapshot(self)
+        
+        tx_count, trade_count, trade_volume, whale_trades = self.market.read()
+        active_posts, total_reviews = await asyncio.gather(
+            self.posts_col.count_documents({"status": "active"}),
+            self.reviews_col.estimated_document_count()
+        )
+        return MarketSnapshot(
+            tx_count=tx_count,
+            trade_count=trade_count,
+            trade_volume=trade_volume,
+            whale_trades=whale_trades,
+            active_posts=active_posts,
+            total_reviews=total_reviews,
+            total_supply=self.circulating_supply
+        )
     
-    async def detect_whale_movement(self):
-        """Detect large trades (>500 RC)"""
-        yesterday = datetime.utcnow().timestamp() - 86400
-        whale_trades = await self.transactions.count_documents({
-            "type": "trade",
-            "amount": {"$gt": 500},
-            "timestamp": {"$gte": yesterday}
-        })
-        return whale_trades > 0
+    async def refresh_shared_state(self):
+        """Pick up the price and supply written by other processes"""
+        tick, supply = await asyncio.gather(
+            self.price_history_col.find_one(
+                {}, projection={"timestamp": 1, "new_price": 1}, sort=[("timestamp", DESCENDING)]
+            ),
+            self.treasury_col.find_one({"_id": "supply"}, projection={"circulating": 1})
+        )
+        latest = self.price_buffer.latest_timestamp
+        if tick and (latest is None or tick["timestamp"] > latest):
+            self.price_buffer.append(tick["timestamp"], tick["new_price"])
+            self.current_rc_price = tick["new_price"]
+        if supply:
+            self.circulating_supply = supply["circulating"]
     
-    async def calculate_total_supply(self):
-        """Calculate total RC supply"""
-        pipeline = [
-            {"$group": {"_id": None, "total_rc": {"$sum": "$rc_balance"}}}
-        ]
-        result = await self.users.aggregate(pipeline).to_list(length=1)
-        return result[0]['total_rc'] if result else 0
+    async def shared_state_loop(self):
+        """Keep every process serving the same price and supply"""
+        while not self.is_closed():
+            await asyncio.sleep(SHARED_STATE_INTERVAL)
+            try:
+                await self.refresh_shared_state()
+            except Exception as e:
+                logger.error(f"Error refreshing shared state: {e}")
     
-    async def cleanup_expired_posts(self):
-        """Clean up posts older than 7 days"""
+    async def market_checkpoint_loop(self):
+        """Periodically persist the rolling market window"""
         await self.wait_until_ready()
         
         while not self.is_closed():
-            try:
-                seven_days_ago = datetime.utcnow().timestamp() - (7 * 86400)
-                
-                expired_posts = await self.posts.update_many(
-                    {"created_at": {"$lt": seven_days_ago}, "status": "active"},
-                    {"$set": {"status": "expired"}}
-                )
-                
-                if expired_posts.modified_count > 0:
-                    logger.info(f"Cleaned up {expired_posts.modified_count} expired posts")
-                    
-            except Exception as e:
-                logger.error(f"Error cleaning posts: {e}")
-            
-            await asyncio.sleep(3600)  # Check every hour
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            if not self.market_ready:
+                continue
+            with self.perf.tick("market_checkpoint"):
+                try:
+                    await self.market.checkpoint(self)
+                except Exception as e:
+                    logger.error(f"Error checkpointing market window: {e}")
+    
+    def new_user_document(self, user_id: int, username: str):
+        """Default document for a user seen for the first time"""
+        user_data = {
+            "_id": user_id,
+            "username": username,
+            "rc_balance": 0,
+            "skills": [],
+            "trust_score": 0,
+            "total_reviews": 0,
+            "mission_completions": {},
+            "premium_tier": "none",
+            "joined_at": datetime.utcnow(),
+            "verification_status": "pending",
+            "scam_status": "clean"
+        }
+        
+        # Founder gets infinite RC
+        if user_id == self.FOUNDER_ID:
+            user_data["rc_balance"] = float('inf')
+            user_data["is_founder"] = True
+            user_data["verification_status"] = "verified"
+        
+        return user_data
     
     async def get_or_create_user(self, user_id: int, username: str):
         """Get user or create if doesn't exist"""
-        user = await self.users.find_one({"_id": user_id})
-        
-        if not user:
-            user_data = {
-                "_id": user_id,
-                "username": username,
-                "rc_balance": 0,
-                "skills": [],
-                "trust_score": 0,
-                "total_reviews": 0,
-                "mission_completions": {},
-                "premium_tier": "none",
-                "joined_at": datetime.utcnow(),
-                "verification_status": "pending",
-                "scam_status": "clean"
-            }
-            
-            # Founder gets infinite RC
-            if user_id == self.FOUNDER_ID:
-                user_data["rc_balance"] = float('inf')
-                user_data["is_founder"] = True
-                user_data["verification_status"] = "verified"
-            
-            await self.users.insert_one(user_data)
-            return user_data
+        user = self.user_cache.get(user_id)
+        if user is not None:
+            return user
         
+        # Single upsert that only writes the defaults for new users
+        user_data = self.new_user_document(user_id, username)
+        del user_data["_id"]
+        user = await self.users_col.find_one_and_update(
+            {"_id": user_id},
+            {"$setOnInsert": user_data},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.user_cache.put(user_id, user)
         return user
     
-    async def log_transaction(self, user_id: int, tx_type: str, amount: float, details: dict):
-        """Log all transactions"""
-        tx_data = {
+    async def log_transaction(self, user_id: int, tx_type: str, amount: float, details: dict, durable: bool = False):
+        """Log all transactions
+
+        Entries are batched by the write-behind ledger; pass durable=True to
+        wait until Mongo has acknowledged the entry.
+        """
+        tx_data = self.transaction_entry(user_id, tx_type, amount, details)
+        self.observe_transaction(tx_data)
+        await self.ledger.write(tx_data, durable=durable)
+    
+    def transaction_entry(self, user_id: int, tx_type: str, amount: float, details: dict):
+        return {
             "user_id": user_id,
             "type": tx_type,
             "amount": amount,
             "details": details,
             "timestamp": datetime.utcnow()
         }
-        await self.transactions.insert_one(tx_data)
+    
+    def observe_transaction(self, tx_data: dict):
+        """Feed a logged transaction to the market metrics and anomaly detector"""
+        details = tx_data["details"]
+        self.market.record(tx_data["type"], tx_data["amount"], tx_data["timestamp"])
+        if details and "to" in details and tx_data["user_id"] != self.FOUNDER_ID:
+            self.anomalies.observe(tx_data["user_id"], details["to"], abs(tx_data["amount"]))
 
 # Run the bot
 def main():
@@ -1,9 +1,85 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
+from config import FOUNDER_ID
 
-class PlaceholderCog(commands.Cog):
+def ms(seconds: float):
+    return f"{seconds * 1000:.0f}ms"
+
+class AdminCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+    
+    @app_commands.command(name="cache_stats", description="Show user cache statistics (Admin only)")
+    @app_commands.default_permissions(administrator=True)
+    async def cache_stats(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Administrator permission required.", ephemeral=True)
+            return
+        
+        stats = self.bot.user_cache.stats()
+        
+        embed = discord.Embed(
+            title="🗄️ User Cache",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="Entries", value=f"{stats['size']:,} / {stats['maxsize']:,}", inline=True)
+        embed.add_field(name="TTL", value=f"{stats['ttl']}s", inline=True)
+        embed.add_field(name="Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+        embed.add_field(name="Hits", value=f"{stats['hits']:,}", inline=True)
+        embed.add_field(name="Misses", value=f"{stats['misses']:,}", inline=True)
+        embed.add_field(name="Evictions", value=f"{stats['evictions']:,} (+{stats['expirations']:,} expired)", inline=True)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="perf", description="Show command, database and task latency (Admin only)")
+    @app_commands.default_permissions(administrator=True)
+    async def perf(self, interaction: discord.Interaction):
+        is_admin = interaction.guild is not None and interaction.user.guild_permissions.administrator
+        if interaction.user.id != FOUNDER_ID and not is_admin:
+            await interaction.response.send_message("❌ Administrator permission required.", ephemeral=True)
+            return
+        
+        perf = self.bot.perf
+        embed = discord.Embed(
+            title="⏱️ Performance",
+            description=f"Since <t:{int(perf.started_at.timestamp())}:R>",
+            color=discord.Color.blurple()
+        )
+        
+        # Busiest commands first
+        commands_by_count = sorted(perf.commands.items(), key=lambda item: item[1]["total"].count, reverse=True)
+        lines = []
+        for name, phases in commands_by_count[:10]:
+            total = phases["total"]
+            errors = perf.errors.get(name, 0)
+            lines.append(
+                f"`/{name}` {total.count:,}× p50 ≤{ms(total.quantile(0.5))} p95 ≤{ms(total.quantile(0.95))}"
+                f"{f' ({errors} errors)' if errors else ''}\n"
+                f"↳ defer {ms(phases['defer'].mean)} · db {ms(phases['db'].mean)} · api {ms(phases['api'].mean)} avg"
+            )
+        embed.add_field(name="Commands", value="\n".join(lines) or "No commands yet", inline=False)
+        
+        # Collections and operations by total time spent
+        with perf.listener.lock:
+            mongo = sorted(perf.mongo.items(), key=lambda item: item[1].sum, reverse=True)[:10]
+            failures = dict(perf.mongo_failures)
+        lines = []
+        for (collection, op), hist in mongo:
+            failed = failures.get((collection, op), 0)
+            lines.append(
+                f"`{collection}.{op}` {hist.count:,}× avg {ms(hist.mean)} p95 ≤{ms(hist.quantile(0.95))}"
+                f"{f' ({failed} failed)' if failed else ''}"
+            )
+        embed.add_field(name="MongoDB", value="\n".join(lines) or "No commands yet", inline=False)
+        
+        lines = []
+        for task, hist in sorted(perf.tasks.items()):
+            last = perf.last_tick[task]
+            lines.append(f"`{task}` {hist.count:,} ticks, avg {ms(hist.mean)}, last <t:{int(last.timestamp())}:R>")
+        embed.add_field(name="Background Tasks", value="\n".join(lines) or "No ticks yet", inline=False)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
 async def setup(bot):
-    await bot.add_cog(PlaceholderCog(bot))
+    await bot.add_cog(AdminCog(bot))
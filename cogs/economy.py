@@ -2,8 +2,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import asyncio
-from datetime import datetime
-from config import TAX_RATES, FOUNDER_ID
+from datetime import datetime, timedelta
+from config import FOUNDER_ID
+from core.cooldowns import cooldown, refund_cooldown
+from core.ledger import transfer, InsufficientFunds, TransferBlocked
 
 class EconomyCog(commands.Cog):
     def __init__(self, bot):
@@ -59,54 +61,19 @@ class EconomyCog(commands.Cog):
             # Get sender data
             sender_data = await self.bot.get_or_create_user(interaction.user.id, interaction.user.name)
             
-            # Founder can send unlimited RC
-            if interaction.user.id != FOUNDER_ID:
-                if sender_data['rc_balance'] < amount:
-                    await interaction.followup.send("❌ Insufficient RC balance.")
-                    return
-            
-            # Get receiver data
-            receiver_data = await self.bot.get_or_create_user(user.id, user.name)
-            
-            # Calculate tax
-            tax_rate = TAX_RATES[sender_data.get('premium_tier', 'normal')]
-            if interaction.user.id == FOUNDER_ID:
-                tax_rate = 0
-            
-            tax_amount = int(amount * tax_rate)
-            net_amount = amount - tax_amount
-            
-            # Update balances (Founder doesn't deduct)
-            if interaction.user.id != FOUNDER_ID:
-                await self.bot.users.update_one(
-                    {"_id": interaction.user.id},
-                    {"$inc": {"rc_balance": -amount}}
-                )
-            
-            await self.bot.users.update_one(
-                {"_id": user.id},
-                {"$inc": {"rc_balance": net_amount}}
-            )
-            
-            # Add tax to treasury
-            if tax_amount > 0:
-                await self.bot.treasury.update_one(
-                    {"_id": "main"},
-                    {"$inc": {"balance": tax_amount, "total_tax_collected": tax_amount}}
-                )
-            
-            # Log transaction
-            await self.bot.log_transaction(interaction.user.id, "payment", -amount, {
-                "to": user.id,
-                "tax": tax_amount,
-                "net_sent": net_amount
-            })
+            # Debit, credit, tax and ledger in one transfer (Founder doesn't deduct)
+            try:
+                result = await transfer(self.bot, sender_data, user.id, user.name, amount)
+            except InsufficientFunds:
+                await interaction.followup.send("❌ Insufficient RC balance.")
+                return
+            except TransferBlocked:
+                await interaction.followup.send("🚫 This transfer was blocked as suspicious and reported to the moderators.")
+                return
             
-            await self.bot.log_transaction(user.id, "payment_received", net_amount, {
-                "from": interaction.user.id,
-                "original_amount": amount,
-                "tax": tax_amount
-            })
+            tax_rate = result["tax_rate"]
+            tax_amount = result["tax"]
+            net_amount = result["net"]
             
             embed = discord.Embed(
                 title="✅ Payment Successful",
@@ -121,27 +88,38 @@ class EconomyCog(commands.Cog):
             await interaction.followup.send(embed=embed)
             
         except Exception as e:
+            self.bot.perf.error(interaction, e)
             await interaction.followup.send("❌ An error occurred during payment.")
     
     @app_commands.command(name="trade", description="Trade RC with another user")
     @app_commands.describe(user="User to trade with", amount="Amount of RC", reason="Reason for trade")
+    @cooldown("trade")
     async def trade(self, interaction: discord.Interaction, user: discord.User, amount: app_commands.Range[int, 1], reason: str = "Trade"):
-        # Similar implementation to pay but with trade-specific logic
-        await interaction.response.defer()
+        if user.bot:
+            await interaction.response.send_message("❌ You cannot trade with bots.", ephemeral=True)
+            await refund_cooldown(interaction)
+            return
         
-        # Check cooldown
-        # Implement cooldown logic here
+        if user.id == interaction.user.id:
+            await interaction.response.send_message("❌ You cannot trade with yourself.", ephemeral=True)
+            await refund_cooldown(interaction)
+            return
+        
+        await interaction.response.defer()
         
         try:
-            # Similar to pay command but with trade logging
             sender_data = await self.bot.get_or_create_user(interaction.user.id, interaction.user.name)
             
-            if interaction.user.id != FOUNDER_ID and sender_data['rc_balance'] < amount:
+            try:
+                result = await transfer(self.bot, sender_data, user.id, user.name, amount, "trade", {"reason": reason})
+            except InsufficientFunds:
                 await interaction.followup.send("❌ Insufficient RC balance.")
+                await refund_cooldown(interaction)
+                return
+            except TransferBlocked:
+                await interaction.followup.send("🚫 This transfer was blocked as suspicious and reported to the moderators.")
+                await refund_cooldown(interaction)
                 return
-            
-            # Calculate tax and process trade
-            # ... (similar to pay command)
             
             embed = discord.Embed(
                 title="🤝 Trade Completed",
@@ -149,10 +127,14 @@ class EconomyCog(commands.Cog):
                 color=discord.Color.blue()
             )
             embed.add_field(name="Reason", value=reason, inline=False)
+            if result["tax"] > 0:
+                embed.add_field(name="Tax", value=f"{result['tax']:,} RC", inline=True)
+                embed.add_field(name="Net Received", value=f"{result['net']:,} RC", inline=True)
             
             await interaction.followup.send(embed=embed)
             
         except Exception as e:
+            self.bot.perf.error(interaction, e)
             await interaction.followup.send("❌ An error occurred during trade.")
     
     @app_commands.command(name="price", description="Check current RC price")
@@ -166,18 +148,58 @@ class EconomyCog(commands.Cog):
         embed.add_field(name="Current Rate", value=f"1000 RC = {robux_per_1000:.0f} Robux", inline=False)
         embed.add_field(name="RC Price", value=f"{self.bot.current_rc_price:.6f}", inline=True)
         
-        # Get 24h change
-        yesterday = datetime.utcnow().timestamp() - 86400
-        old_price_data = await self.bot.price_history.find_one(
-            {"timestamp": {"$gte": yesterday}},
-            sort=[("timestamp", -1)]
-        )
+        # Market activity from the in-memory rolling window
+        tx_count, trade_count, trade_volume, whale_trades = self.bot.market.read()
+        embed.add_field(name="24h Volume", value=f"{trade_volume:,} RC ({trade_count} trades)", inline=True)
+        
+        # Get 24h change from the in-memory tick buffer
+        old_price = self.bot.price_buffer.price_at(datetime.utcnow() - timedelta(hours=24))
         
-        if old_price_data:
-            change = ((self.bot.current_rc_price - old_price_data['old_price']) / old_price_data['old_price']) * 100
+        if old_price:
+            change = ((self.bot.current_rc_price - old_price) / old_price) * 100
             embed.add_field(name="24h Change", value=f"{change:+.2f}%", inline=True)
         
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="price_history", description="Show RC price history")
+    @app_commands.describe(days="How many days of history to show")
+    async def price_history(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 3650] = 7):
+        await interaction.response.defer()
+        
+        end = datetime.utcnow()
+        resolution, candles = await self.bot.candles.fetch(end - timedelta(days=days), end)
+        
+        if not candles:
+            await interaction.followup.send("❌ No price history for that range yet.")
+            return
+        
+        opening = candles[0]['open']
+        closing = candles[-1]['close']
+        change = ((closing - opening) / opening) * 100
+        
+        embed = discord.Embed(
+            title=f"📈 RC Price History ({days}d)",
+            description=f"`{sparkline([c['close'] for c in candles])}`",
+            color=discord.Color.green() if change >= 0 else discord.Color.red()
+        )
+        embed.add_field(name="Open", value=f"{opening:.6f}", inline=True)
+        embed.add_field(name="Close", value=f"{closing:.6f}", inline=True)
+        embed.add_field(name="Change", value=f"{change:+.2f}%", inline=True)
+        embed.add_field(name="High", value=f"{max(c['high'] for c in candles):.6f}", inline=True)
+        embed.add_field(name="Low", value=f"{min(c['low'] for c in candles):.6f}", inline=True)
+        embed.set_footer(text=f"{len(candles)} × {resolution} candles")
+        
+        await interaction.followup.send(embed=embed)
+
+def sparkline(values, width=40):
+    """Render values as a one-line block chart"""
+    blocks = "▁▂▃▄▅▆▇█"
+    if len(values) > width:
+        step = len(values) / width
+        values = [values[int(i * step)] for i in range(width)]
+    low, high = min(values), max(values)
+    spread = (high - low) or 1
+    return ''.join(blocks[int((v - low) / spread * (len(blocks) - 1))] for v in values)
+
 async def setup(bot):
     await bot.add_cog(EconomyCog(bot))
@@ -2,6 +2,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from config import FOUNDER_ID
+from core.airdrop import AIRDROP_PROGRESS_THRESHOLD
+from core.metrics import PRICE_FLOOR
 
 class FounderCog(commands.Cog):
     def __init__(self, bot):
@@ -15,23 +17,38 @@ class FounderCog(commands.Cog):
         return True
     
     @app_commands.command(name="founder_event", description="Create a global airdrop event (Founder only)")
-    @app_commands.describe(event_name="Name of the event", amount="RC amount to airdrop")
-    async def founder_event(self, interaction: discord.Interaction, event_name: str, amount: app_commands.Range[int, 1]):
+    @app_commands.describe(event_name="Name of the event", amount="RC amount to airdrop", per_user_ledger="Log a ledger entry for every recipient")
+    async def founder_event(self, interaction: discord.Interaction, event_name: str, amount: app_commands.Range[int, 1], per_user_ledger: bool = False):
         if not await self.is_founder(interaction):
             return
         
         await interaction.response.defer()
         
-        # Airdrop to all verified users
-        verified_users = self.bot.users.find({"verification_status": "verified"})
-        user_count = 0
+        # Airdrop to all verified users in bulk chunks
+        job = await self.bot.airdrops.start(
+            event_name, amount, interaction.user.id,
+            per_user_ledger=per_user_ledger,
+            channel_id=interaction.channel_id
+        )
+        
+        progress = None
+        if job["total"] >= AIRDROP_PROGRESS_THRESHOLD:
+            async def progress(credited, total):
+                try:
+                    await interaction.edit_original_response(
+                        content=f"⏳ Airdrop in progress: {credited:,}/{total:,} users credited"
+                    )
+                except discord.HTTPException:
+                    pass
         
-        async for user in verified_users:
-            await self.bot.users.update_one(
-                {"_id": user["_id"]},
-                {"$inc": {"rc_balance": amount}}
+        job = await self.bot.airdrops.run(job, progress=progress)
+        if job["status"] != "completed":
+            await interaction.followup.send(
+                f"⏳ Airdrop **{event_name}** is being finished in the background; "
+                f"the result will be posted here."
             )
-            user_count += 1
+            return
+        user_count = job["credited"]
         
         embed = discord.Embed(
             title="🎉 Global Airdrop Event",
@@ -45,13 +62,15 @@ class FounderCog(commands.Cog):
         await interaction.followup.send(embed=embed)
     
     @app_commands.command(name="set_global_price", description="Set the global RC price (Founder only)")
-    @app_commands.describe(new_price="New RC price")
-    async def set_global_price(self, interaction: discord.Interaction, new_price: float):
+    @app_commands.describe(new_price=f"New RC price (at least {PRICE_FLOOR})")
+    async def set_global_price(self, interaction: discord.Interaction, new_price: app_commands.Range[float, PRICE_FLOOR]):
         if not await self.is_founder(interaction):
             return
         
+        await interaction.response.defer()
+        
         old_price = self.bot.current_rc_price
-        self.bot.current_rc_price = new_price
+        await self.bot.record_price(new_price, source="founder")
         
         embed = discord.Embed(
             title="💰 Global Price Update",
@@ -61,7 +80,7 @@ class FounderCog(commands.Cog):
         embed.add_field(name="New Price", value=f"{new_price:.6f}", inline=True)
         embed.add_field(name="Changed by", value="The Founder", inline=False)
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
     
     @app_commands.command(name="rc_lore", description="Learn about the origin of RCredits")
     async def rc_lore(self, interaction: discord.Interaction):
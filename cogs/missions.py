@@ -1,9 +1,56 @@
+import os
 import discord
+from discord import app_commands
 from discord.ext import commands
+from datetime import datetime, timedelta
+from config import DAILY_MISSIONS, WEEKLY_MISSIONS
+from core.missions import week_start
 
-class PlaceholderCog(commands.Cog):
+class MissionsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        announcement_channel_id = os.getenv('ANNOUNCEMENT_CHANNEL_ID', '')
+        self.announcement_channel_id = int(announcement_channel_id) if announcement_channel_id.isdigit() else None
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if after.channel and not before.channel and not member.bot:
+            self.bot.mission_tracker.complete(member.id, "join_vc", member.name)
+    
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if payload.channel_id != self.announcement_channel_id or not payload.member or payload.member.bot:
+            return
+        self.bot.mission_tracker.complete(payload.user_id, "react_announcement", payload.member.name)
+    
+    @app_commands.command(name="missions", description="Show missions, rewards and last week's winners")
+    async def missions(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        
+        embed = discord.Embed(
+            title="🎯 Missions",
+            color=discord.Color.blurple()
+        )
+        
+        completed = set(self.bot.mission_tracker.completed(interaction.user.id))
+        daily = '\n'.join(
+            f"{'✅' if name in completed else '⬜'} {name.replace('_', ' ').title()} — {reward} RC"
+            for name, reward in DAILY_MISSIONS.items()
+        )
+        weekly = '\n'.join(f"{name.replace('_', ' ').title()} — {reward} RC" for name, reward in WEEKLY_MISSIONS.items())
+        embed.add_field(name="Daily", value=daily, inline=True)
+        embed.add_field(name="Weekly", value=weekly, inline=True)
+        
+        last_week = week_start(datetime.utcnow()) - timedelta(weeks=1)
+        checkpoint = await self.bot.missions_col.find_one({"_id": f"weekly:{last_week.date().isoformat()}"})
+        if checkpoint and checkpoint.get("winners"):
+            winners = '\n'.join(
+                f"{mission.replace('_', ' ').title()}: <@{winner['user_id']}> ({winner['count']})"
+                for mission, winner in checkpoint["winners"].items()
+            )
+            embed.add_field(name="Last Week's Winners", value=winners, inline=False)
+        
+        await interaction.followup.send(embed=embed)
 
 async def setup(bot):
-    await bot.add_cog(PlaceholderCog(bot))
+    await bot.add_cog(MissionsCog(bot))
@@ -2,7 +2,174 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime, timedelta
+from bson import ObjectId
 from config import SKILLS
+from core.cooldowns import cooldown, refund_cooldown
+from core.skills import skill_mask
+
+# Posts shown per /search page
+SEARCH_PAGE_SIZE = 5
+
+# Pending posts shown per /review_queue page
+REVIEW_PAGE_SIZE = 10
+
+class PostPager(discord.ui.View):
+    """Keyset-paginated list of posts
+
+    Each page is fetched with a (created_at, _id) cursor, so page 50 costs the
+    same as page 1. The start cursor of every visited page is kept so Previous
+    can re-run that page's query.
+    """
+    
+    page_size = SEARCH_PAGE_SIZE
+    newest_first = True
+    title = "💼 Posts"
+    color = discord.Color.blue()
+    empty_message = "No posts."
+    
+    def __init__(self, cog, author_id: int, query: dict):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.author_id = author_id
+        self.query = query
+        self.page_starts = [None]
+        self.next_cursor = None
+        self.posts = []
+    
+    async def load(self):
+        """Fetch the page starting at the newest cursor in page_starts"""
+        query = dict(self.query)
+        cursor = self.page_starts[-1]
+        direction = -1 if self.newest_first else 1
+        if cursor:
+            created_at, post_id = cursor
+            after = "$lt" if self.newest_first else "$gt"
+            query["$or"] = [
+                {"created_at": {after: created_at}},
+                {"created_at": created_at, "_id": {after: post_id}}
+            ]
+        
+        posts = await self.cog.bot.posts_col.find(query).sort(
+            [("created_at", direction), ("_id", direction)]
+        ).limit(self.page_size + 1).to_list(length=self.page_size + 1)
+        
+        self.posts = posts[:self.page_size]
+        has_more = len(posts) > self.page_size
+        self.next_cursor = (self.posts[-1]["created_at"], self.posts[-1]["_id"]) if has_more else None
+        
+        self.previous_page.disabled = len(self.page_starts) == 1
+        self.next_page.disabled = self.next_cursor is None
+    
+    def build_embed(self):
+        embed = discord.Embed(title=self.title, color=self.color)
+        
+        if not self.posts:
+            embed.description = self.empty_message
+        
+        for post in self.posts:
+            value = f"{post['description'][:150]}\n**Skills:** {', '.join(post['skills'])}"
+            if post.get('price_range'):
+                value += f" • **Price:** {post['price_range']}"
+            value += f"\n<@{post['author_id']}> • `{post['_id']}`"
+            embed.add_field(name=f"💼 {post['type'].title()}: {post['title']}", value=value, inline=False)
+        
+        embed.set_footer(text=f"Page {len(self.page_starts)}")
+        return embed
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ These buttons belong to someone else.", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary, row=1)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_starts.pop()
+        await self.load()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+    
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.primary, row=1)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_starts.append(self.next_cursor)
+        await self.load()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+class SearchView(PostPager):
+    """/search results, newest first"""
+    
+    title = "🔎 Post Search"
+    empty_message = "No matching posts."
+
+class ReviewQueueView(PostPager):
+    """Pending posts, oldest first, with bulk approve/reject
+
+    Approve and Reject act on the posts picked in the select menu, or on the
+    whole page when nothing is picked.
+    """
+    
+    page_size = REVIEW_PAGE_SIZE
+    newest_first = False
+    
+    def __init__(self, cog, author_id: int):
+        super().__init__(cog, author_id, {"status": "pending"})
+        self.selected = []
+    
+    async def load(self):
+        await super().load()
+        self.selected = []
+        
+        options = [
+            discord.SelectOption(label=post['title'][:100], description=f"{post['type']} by {post['author_name']}"[:100], value=str(post['_id']))
+            for post in self.posts
+        ]
+        self.pick_posts.options = options or [discord.SelectOption(label="Queue empty", value="none")]
+        self.pick_posts.max_values = max(1, len(options))
+        self.pick_posts.disabled = not options
+        self.approve.disabled = not options
+        self.reject.disabled = not options
+    
+    def build_embed(self):
+        embed = discord.Embed(
+            title="📋 Pending Posts",
+            color=discord.Color.orange()
+        )
+        
+        if not self.posts:
+            embed.description = "The review queue is empty. 🎉"
+        
+        for post in self.posts:
+            value = f"{post['description'][:100]}\n**Skills:** {', '.join(post['skills'])}"
+            value += f"\n<@{post['author_id']}> • `{post['_id']}` • <t:{int(post['created_at'])}:R>"
+            embed.add_field(name=f"💼 {post['type'].title()}: {post['title']}", value=value, inline=False)
+        
+        embed.set_footer(text=f"Page {len(self.page_starts)}")
+        return embed
+    
+    def targets(self):
+        if self.selected:
+            return [ObjectId(post_id) for post_id in self.selected]
+        return [post['_id'] for post in self.posts]
+    
+    async def moderate(self, interaction: discord.Interaction, status: str):
+        await interaction.response.defer()
+        posts = await self.cog.moderate_posts(interaction.user.id, self.targets(), status)
+        await self.load()
+        await interaction.edit_original_response(embed=self.build_embed(), view=self)
+        action = "approved" if status == "active" else status
+        await interaction.followup.send(f"✅ {len(posts)} posts {action}.", ephemeral=True)
+    
+    @discord.ui.select(placeholder="Pick posts (default: whole page)", min_values=0, row=0)
+    async def pick_posts(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.selected = select.values
+        await interaction.response.defer()
+    
+    @discord.ui.button(label="Approve", style=discord.ButtonStyle.success, row=2)
+    async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.moderate(interaction, "active")
+    
+    @discord.ui.button(label="Reject", style=discord.ButtonStyle.danger, row=2)
+    async def reject(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.moderate(interaction, "rejected")
 
 class PostsCog(commands.Cog):
     def __init__(self, bot):
@@ -14,6 +181,7 @@ class PostsCog(commands.Cog):
         app_commands.Choice(name="hiring", value="hiring"),
         app_commands.Choice(name="forhire", value="forhire")
     ])
+    @cooldown("post")
     async def post(self, interaction: discord.Interaction, post_type: str, title: str, description: str, skills: str, price_range: str = None):
         await interaction.response.defer()
         
@@ -23,6 +191,7 @@ class PostsCog(commands.Cog):
         
         if not valid_skills:
             await interaction.followup.send("❌ No valid skills provided. Use /skills to see available skills.")
+            await refund_cooldown(interaction)
             return
         
         # Create post data
@@ -33,6 +202,7 @@ class PostsCog(commands.Cog):
             "title": title,
             "description": description,
             "skills": valid_skills,
+            "skill_mask": skill_mask(valid_skills),
             "price_range": price_range,
             "status": "pending",
             "created_at": datetime.utcnow().timestamp(),
@@ -40,7 +210,9 @@ class PostsCog(commands.Cog):
         }
         
         # Insert post
-        result = await self.bot.posts.insert_one(post_data)
+        result = await self.bot.posts_col.insert_one(post_data)
+        self.bot.leaderboards.adjust("posts_created", interaction.user.id, 1)
+        self.bot.mission_tracker.complete(interaction.user.id, "post_activity", interaction.user.name)
         
         # Send to approval queue
         embed = self.create_post_embed(post_data, interaction.user)
@@ -59,6 +231,30 @@ class PostsCog(commands.Cog):
             "title": title
         })
     
+    @app_commands.command(name="search", description="Search active posts")
+    @app_commands.describe(skill="Skill to filter by", post_type="Type of post", query="Words to search titles and descriptions for")
+    @app_commands.choices(
+        skill=[app_commands.Choice(name=s, value=s) for s in SKILLS],
+        post_type=[
+            app_commands.Choice(name="hiring", value="hiring"),
+            app_commands.Choice(name="forhire", value="forhire")
+        ]
+    )
+    async def search(self, interaction: discord.Interaction, skill: str = None, post_type: str = None, query: str = None):
+        await interaction.response.defer()
+        
+        filters = {"status": "active"}
+        if post_type:
+            filters["type"] = post_type
+        if skill:
+            filters["skill_mask"] = {"$bitsAllSet": skill_mask([skill])}
+        if query:
+            filters["$text"] = {"$search": query}
+        
+        view = SearchView(self, interaction.user.id, filters)
+        await view.load()
+        await interaction.followup.send(embed=view.build_embed(), view=view)
+    
     def create_post_embed(self, post_data, author):
         embed = discord.Embed(
             title=f"💼 {post_data['type'].title()}: {post_data['title']}",
@@ -67,7 +263,10 @@ class PostsCog(commands.Cog):
             timestamp=datetime.utcnow()
         )
         
-        embed.set_author(name=author.display_name, icon_url=author.display_avatar.url)
+        if author:
+            embed.set_author(name=author.display_name, icon_url=author.display_avatar.url)
+        else:
+            embed.set_author(name=post_data['author_name'])
         
         embed.add_field(name="Skills", value=', '.join(post_data['skills']), inline=True)
         
@@ -81,6 +280,58 @@ class PostsCog(commands.Cog):
         
         return embed
     
+    async def moderate_posts(self, moderator_id: int, post_ids: list, status: str):
+        """Move pending posts to a new status in bulk and return the posts changed
+
+        Approved posts are published to the posts channel through the bot's
+        rate-limited sender.
+        """
+        # Tag this batch so concurrent moderators never both claim a post
+        batch_id = ObjectId()
+        await self.bot.posts_col.update_many(
+            {"_id": {"$in": post_ids}, "status": "pending"},
+            {"$set": {"status": status, "reviewed_by": moderator_id, "review_batch": batch_id}}
+        )
+        posts = await self.bot.posts_col.find(
+            {"_id": {"$in": post_ids}, "review_batch": batch_id}
+        ).to_list(length=None)
+        
+        if status == "active":
+            embeds = []
+            for post in posts:
+                self.bot.expiry.schedule("post", post["_id"], post["expires_at"])
+                
+                # Authors come from the gateway cache; no REST lookups per post
+                embed = self.create_post_embed(post, self.bot.get_user(post['author_id']))
+                embed.title = f"✅ {embed.title}"
+                embed.color = discord.Color.green()
+                embeds.append(embed)
+            
+            if self.bot.posts_channel_id and embeds:
+                self.bot.sender.publish(self.bot.posts_channel_id, *embeds)
+        
+        tx_type = "post_approved" if status == "active" else f"post_{status}"
+        for post in posts:
+            await self.bot.log_transaction(moderator_id, tx_type, 0, {
+                "post_id": str(post["_id"]),
+                "author_id": post['author_id']
+            })
+        
+        return posts
+    
+    @app_commands.command(name="review_queue", description="Review pending posts in bulk (Admin only)")
+    @app_commands.default_permissions(administrator=True)
+    async def review_queue(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Administrator permission required.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        view = ReviewQueueView(self, interaction.user.id)
+        await view.load()
+        await interaction.followup.send(embed=view.build_embed(), view=view, ephemeral=True)
+    
     @app_commands.command(name="approvepost", description="Approve a post (Admin only)")
     @app_commands.default_permissions(administrator=True)
     async def approvepost(self, interaction: discord.Interaction, post_id: str):
@@ -91,48 +342,16 @@ class PostsCog(commands.Cog):
         await interaction.response.defer()
         
         try:
-            from bson import ObjectId
-            post = await self.bot.posts.find_one({"_id": ObjectId(post_id)})
+            posts = await self.moderate_posts(interaction.user.id, [ObjectId(post_id)], "active")
             
-            if not post:
-                await interaction.followup.send("❌ Post not found.")
+            if not posts:
+                await interaction.followup.send("❌ Post not found or already reviewed.")
                 return
             
-            # Update post status
-            await self.bot.posts.update_one(
-                {"_id": ObjectId(post_id)},
-                {"$set": {"status": "active"}}
-            )
-            
-            # Get author user object
-            author = self.bot.get_user(post['author_id'])
-            if not author:
-                try:
-                    author = await self.bot.fetch_user(post['author_id'])
-                except:
-                    author = None
-            
-            # Create approved embed
-            embed = self.create_post_embed(post, author or discord.Object(id=post['author_id']))
-            embed.title = f"✅ {embed.title}"
-            embed.color = discord.Color.green()
-            
-            # Send to posts channel
-            posts_channel_id = self.bot.posts_channel_id  # Set this in your bot
-            if posts_channel_id:
-                channel = self.bot.get_channel(posts_channel_id)
-                if channel:
-                    await channel.send(embed=embed)
-            
             await interaction.followup.send("✅ Post approved and published!")
             
-            # Log approval
-            await self.bot.log_transaction(interaction.user.id, "post_approved", 0, {
-                "post_id": post_id,
-                "author_id": post['author_id']
-            })
-            
         except Exception as e:
+            self.bot.perf.error(interaction, e)
             await interaction.followup.send("❌ Error approving post.")
 
 async def setup(bot):
@@ -1,9 +1,51 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
+from core.leaderboard import BOARDS
 
-class PlaceholderCog(commands.Cog):
+class ProfilesCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+    
+    @app_commands.command(name="leaderboard", description="Show the top users")
+    @app_commands.describe(board="What to rank users by")
+    @app_commands.choices(board=[app_commands.Choice(name=name, value=key) for key, name in BOARDS.items()])
+    async def leaderboard(self, interaction: discord.Interaction, board: str = "rc_balance"):
+        ranking = self.bot.leaderboards.boards[board]
+        
+        embed = discord.Embed(
+            title=f"🏆 Leaderboard: {BOARDS[board]}",
+            color=discord.Color.gold()
+        )
+        
+        score_format = "{:.2f}" if board == "trust_score" else "{:,.0f}"
+        lines = [
+            f"**#{position}** <@{user_id}> — {score_format.format(score)}"
+            for position, (user_id, score) in enumerate(ranking.top(10), start=1)
+        ]
+        embed.description = '\n'.join(lines) or "Nobody is ranked yet."
+        
+        rank = ranking.rank(interaction.user.id)
+        if rank:
+            embed.set_footer(text=f"Your rank: #{rank:,} of {len(ranking):,}")
+        
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="rank", description="Show where a user ranks on every leaderboard")
+    async def rank(self, interaction: discord.Interaction, user: discord.User = None):
+        target_user = user or interaction.user
+        
+        embed = discord.Embed(
+            title=f"📊 {target_user.display_name}'s Ranks",
+            color=discord.Color.gold()
+        )
+        
+        for key, name in BOARDS.items():
+            ranking = self.bot.leaderboards.boards[key]
+            rank = ranking.rank(target_user.id)
+            embed.add_field(name=name, value=f"#{rank:,} of {len(ranking):,}" if rank else "Unranked", inline=True)
+        
+        await interaction.response.send_message(embed=embed)
 
 async def setup(bot):
-    await bot.add_cog(PlaceholderCog(bot))
+    await bot.add_cog(ProfilesCog(bot))
@@ -1,9 +1,80 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
+from core.cooldowns import cooldown, refund_cooldown
 
-class PlaceholderCog(commands.Cog):
+class ReviewsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+    
+    @app_commands.command(name="review", description="Review a user you worked with")
+    @app_commands.describe(user="User to review", rating="Rating from 1 to 5", comment="How did it go?")
+    @cooldown("review")
+    async def review(self, interaction: discord.Interaction, user: discord.User, rating: app_commands.Range[int, 1, 5], comment: str):
+        if user.bot:
+            await interaction.response.send_message("❌ You cannot review bots.", ephemeral=True)
+            await refund_cooldown(interaction)
+            return
+        
+        if user.id == interaction.user.id:
+            await interaction.response.send_message("❌ You cannot review yourself.", ephemeral=True)
+            await refund_cooldown(interaction)
+            return
+        
+        await interaction.response.defer()
+        
+        try:
+            reviewer_data = await self.bot.get_or_create_user(interaction.user.id, interaction.user.name)
+            await self.bot.get_or_create_user(user.id, user.name)
+            
+            review, target = await self.bot.trust.add_review(reviewer_data, user.id, rating, comment)
+            
+            self.bot.mission_tracker.complete(interaction.user.id, "give_review", interaction.user.name)
+            await self.bot.log_transaction(interaction.user.id, "review_given", 0, {
+                "target_id": user.id,
+                "rating": rating
+            })
+            
+            embed = discord.Embed(
+                title="⭐ Review Submitted",
+                description=f"{'⭐' * rating} for {user.mention}\n> {comment}",
+                color=discord.Color.gold()
+            )
+            embed.add_field(name="Trust Score", value=f"{target['trust_score']:.2f} / 5", inline=True)
+            embed.add_field(name="Total Reviews", value=f"{target['total_reviews']:,}", inline=True)
+            
+            await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            self.bot.perf.error(interaction, e)
+            await interaction.followup.send("❌ An error occurred while submitting the review.")
+    
+    @app_commands.command(name="reviews", description="Show a user's trust score and recent reviews")
+    async def reviews(self, interaction: discord.Interaction, user: discord.User = None):
+        target_user = user or interaction.user
+        
+        await interaction.response.defer()
+        
+        user_data = await self.bot.get_or_create_user(target_user.id, target_user.name)
+        recent = await self.bot.reviews_col.find(
+            {"target_id": target_user.id}
+        ).sort("created_at", -1).limit(5).to_list(length=5)
+        
+        embed = discord.Embed(
+            title=f"⭐ {target_user.display_name}'s Reviews",
+            color=discord.Color.gold()
+        )
+        embed.add_field(name="Trust Score", value=f"{user_data.get('trust_score', 0):.2f} / 5", inline=True)
+        embed.add_field(name="Total Reviews", value=f"{user_data.get('total_reviews', 0):,}", inline=True)
+        
+        for review in recent:
+            embed.add_field(
+                name='⭐' * review['rating'],
+                value=f"{review['comment'][:200]}\n— <@{review['reviewer_id']}> <t:{int(review['created_at'].timestamp())}:R>",
+                inline=False
+            )
+        
+        await interaction.followup.send(embed=embed)
 
 async def setup(bot):
-    await bot.add_cog(PlaceholderCog(bot))
+    await bot.add_cog(ReviewsCog(bot))
@@ -1,9 +1,41 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 
-class PlaceholderCog(commands.Cog):
+class ScamCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+    
+    @app_commands.command(name="ring_scan", description="Scan the ledger for trading rings now (Admin only)")
+    @app_commands.default_permissions(administrator=True)
+    async def ring_scan(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Administrator permission required.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            flagged = await self.bot.ring_detector.scan()
+        except Exception as e:
+            self.bot.perf.error(interaction, e)
+            await interaction.followup.send("❌ Error scanning the ledger.", ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title="🕸️ Ring Scan",
+            description=f"Flagged **{len(flagged)}** suspected rings." if flagged else "No suspected rings found.",
+            color=discord.Color.red() if flagged else discord.Color.green()
+        )
+        
+        for ring in sorted(flagged, key=lambda r: r['score'], reverse=True)[:10]:
+            embed.add_field(
+                name=f"Score {ring['score']:.2f} • {ring['volume']:,} RC over {ring['transfers']} transfers",
+                value=', '.join(f"<@{member}>" for member in ring['members'])[:1024],
+                inline=False
+            )
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def setup(bot):
-    await bot.add_cog(PlaceholderCog(bot))
+    await bot.add_cog(ScamCog(bot))
@@ -21,14 +21,14 @@ WEEKLY_MISSIONS = {
     "most_helpful": 200
 }
 
-# Store items
+# Store items (duration in seconds; timed purchases expire via the expiry scheduler)
 STORE_ITEMS = {
-    "highlight_post": {"price": 150, "description": "Feature your post for 24 hours"},
-    "profile_badge": {"price": 200, "description": "Special profile badge for 30 days"},
+    "highlight_post": {"price": 150, "description": "Feature your post for 24 hours", "duration": int(timedelta(hours=24).total_seconds())},
+    "profile_badge": {"price": 200, "description": "Special profile badge for 30 days", "duration": int(timedelta(days=30).total_seconds())},
     "custom_flair": {"price": 350, "description": "Custom flair in server"},
     "ad_promotion": {"price": 500, "description": "Promote in announcements"},
     "ping_role": {"price": 200, "description": "Ping role in job posts"},
-    "premium_tools": {"price": 100, "description": "Access to premium tools for 7 days"}
+    "premium_tools": {"price": 100, "description": "Access to premium tools for 7 days", "duration": int(timedelta(days=7).total_seconds())}
 }
 
 # Premium tiers
@@ -47,7 +47,7 @@ TAX_RATES = {
     "founder": 0.00
 }
 
-# Skills categories
+# Skills categories (append only: post skill masks use list positions)
 SKILLS = [
     "Scripter", "Modeler", "Animator", "Builder", 
     "UI Designer", "GFX/VFX", "Game Designer", "Musician",
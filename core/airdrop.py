@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import InsertOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger('RCN_Prime')
+
+# Users credited per round trip; also the granularity of checkpoints
+AIRDROP_CHUNK_SIZE = 1000
+
+# Only report progress back to Discord for runs at least this large
+AIRDROP_PROGRESS_THRESHOLD = 5000
+
+# A running job not checkpointed for this long belongs to a dead process (seconds)
+AIRDROP_STALL_TIMEOUT = 120
+
+# Airdrop receipts kept on each user; older jobs can no longer be running
+AIRDROP_RECEIPTS_KEPT = 50
+
+
+class AirdropEngine:
+    """Bulk, resumable airdrops to every verified user
+
+    Each job is a document in ``airdrops`` that records the last user ``_id``
+    credited. Users are credited in ``_id`` order, one ``update_many`` per
+    chunk. The credit pushes the job id onto the user's ``airdrop_receipts``
+    in the same update, and only matches users without that receipt, so a
+    chunk replayed after a crash is a no-op for users already paid even
+    while other airdrops run at the same time.
+
+    The process running a job owns it and keeps ``updated_at`` fresh with a
+    heartbeat. A job whose heartbeat stops is claimed by another process with
+    one atomic update; the previous owner stops at its next checkpoint.
+    """
+
+    def __init__(self, bot, chunk_size: int = AIRDROP_CHUNK_SIZE):
+        self.bot = bot
+        self.chunk_size = chunk_size
+
+    async def start(self, event_name: str, amount: int, created_by: int,
+                    per_user_ledger: bool = False, channel_id: int = None):
+        """Create a new airdrop job and return its document"""
+        job = {
+            "_id": uuid.uuid4().hex,
+            "event_name": event_name,
+            "amount": amount,
+            "created_by": created_by,
+            "per_user_ledger": per_user_ledger,
+            "channel_id": channel_id,
+            "status": "running",
+            "owner": self.bot.leases.holder,
+            "last_user_id": None,
+            "credited": 0,
+            "total": await self.bot.users_col.count_documents({"verification_status": "verified"}),
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        await self.bot.airdrops_col.insert_one(job)
+        return job
+
+    async def run(self, job: dict, progress=None):
+        """Credit every remaining user of a job, checkpointing after each chunk
+
+        ``progress`` is an optional coroutine called as ``progress(credited, total)``
+        after each chunk.
+        """
+        heartbeat = asyncio.create_task(self.heartbeat(job))
+        try:
+            return await self.credit(job, progress)
+        finally:
+            heartbeat.cancel()
+
+    async def heartbeat(self, job: dict):
+        """Keep an owned job from looking stalled while a chunk is slow"""
+        while True:
+            await asyncio.sleep(AIRDROP_STALL_TIMEOUT / 4)
+            try:
+                await self.bot.airdrops_col.update_one(
+                    {"_id": job["_id"], "owner": job["owner"], "status": "running"},
+                    {"$set": {"updated_at": datetime.utcnow()}}
+                )
+            except Exception as e:
+                logger.error(f"Error renewing airdrop {job['_id']}: {e}")
+
+    async def credit(self, job: dict, progress=None):
+        users = self.bot.users_col
+        amount = job["amount"]
+
+        # Users not yet paid by this job
+        unpaid = {
+            "is_founder": {"$ne": True},
+            "airdrop_receipts": {"$ne": job["_id"]}
+        }
+
+        while True:
+            query = {"verification_status": "verified", **unpaid}
+            if job["last_user_id"] is not None:
+                query["_id"] = {"$gt": job["last_user_id"]}
+
+            cursor = users.find(query, projection={"_id": 1}).sort("_id", 1).limit(self.chunk_size)
+            ids = [doc["_id"] async for doc in cursor]
+            if not ids:
+                break
+
+            result = await users.update_many(
+                {"_id": {"$in": ids}, **unpaid},
+                {"$inc": {"rc_balance": amount},
+                 "$push": {"airdrop_receipts": {"$each": [job["_id"]], "$slice": -AIRDROP_RECEIPTS_KEPT}}}
+            )
+
+            self.bot.user_cache.invalidate(*ids)
+            if result.modified_count == len(ids):
+                for user_id in ids:
+                    self.bot.leaderboards.adjust("rc_balance", user_id, amount)
+            else:
+                # Someone else paid part of this chunk; we can't tell who we credited
+                await self.bot.leaderboards.rebuild()
+
+            minted = amount * result.modified_count
+            await self.bot.record_supply_change(circulating=minted, minted=minted)
+
+            if job["per_user_ledger"]:
+                await self.write_user_entries(job, ids)
+
+            job["last_user_id"] = ids[-1]
+            job["credited"] += result.modified_count
+            checkpoint = await self.bot.airdrops_col.update_one(
+                {"_id": job["_id"], "owner": job["owner"]},
+                {"$set": {"last_user_id": job["last_user_id"], "updated_at": datetime.utcnow()},
+                 "$inc": {"credited": result.modified_count}}
+            )
+            if not checkpoint.matched_count:
+                # Claimed by another process; it finishes the job and reports it
+                logger.warning(f"Airdrop {job['_id']} was taken over, stopping")
+                job["status"] = "taken_over"
+                return job
+
+            if progress:
+                await progress(job["credited"], job["total"])
+
+            if len(ids) < self.chunk_size:
+                break
+
+        await self.bot.log_transaction(job["created_by"], "airdrop", amount * job["credited"], {
+            "airdrop_id": job["_id"],
+            "event_name": job["event_name"],
+            "amount_per_user": amount,
+            "recipients": job["credited"]
+        }, durable=True)
+        await self.bot.airdrops_col.update_one(
+            {"_id": job["_id"], "owner": job["owner"]},
+            {"$set": {"status": "completed", "completed_at": datetime.utcnow()}}
+        )
+        job["status"] = "completed"
+        return job
+
+    async def write_user_entries(self, job: dict, user_ids: list):
+        """Insert one ledger row per credited user, skipping rows already written"""
+        now = datetime.utcnow()
+        ops = [
+            InsertOne({
+                "_id": f"{job['_id']}:{user_id}",
+                "user_id": user_id,
+                "type": "airdrop_received",
+                "amount": job["amount"],
+                "details": {"airdrop_id": job["_id"], "event_name": job["event_name"]},
+                "timestamp": now
+            })
+            for user_id in user_ids
+        ]
+        try:
+            await self.bot.transactions_col.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys are rows written before a restart
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+    async def claim_stalled(self):
+        """Take ownership of one running job whose heartbeat stopped"""
+        now = datetime.utcnow()
+        return await self.bot.airdrops_col.find_one_and_update(
+            {"status": "running", "updated_at": {"$lt": now - timedelta(seconds=AIRDROP_STALL_TIMEOUT)}},
+            {"$set": {"owner": self.bot.leases.holder, "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def resume_pending(self):
+        """Finish airdrops whose process stopped checkpointing them"""
+        while (job := await self.claim_stalled()) is not None:
+            logger.info(f"🎁 Resuming airdrop {job['_id']} ({job['event_name']}) after user {job['last_user_id']}")
+            try:
+                job = await self.run(job)
+            except Exception as e:
+                logger.error(f"Error resuming airdrop {job['_id']}: {e}")
+                continue
+            if job["status"] != "completed":
+                continue
+
+            channel = self.bot.get_channel(job["channel_id"]) if job.get("channel_id") else None
+            if channel:
+                try:
+                    await channel.send(
+                        f"🎉 Airdrop **{job['event_name']}** resumed and completed: "
+                        f"{job['amount']:,} RC to {job['credited']} users."
+                    )
+                except Exception:
+                    pass
+
+    async def watch(self):
+        """Resume stalled airdrops now and whenever one stalls later"""
+        while not self.bot.is_closed():
+            try:
+                await self.resume_pending()
+            except Exception as e:
+                logger.error(f"Error checking for stalled airdrops: {e}")
+            await asyncio.sleep(AIRDROP_STALL_TIMEOUT)
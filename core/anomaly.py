@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+logger = logging.getLogger('RCN_Prime')
+
+# Time constants of the decayed counters (seconds)
+BURST_TAU = 60
+PAIR_TAU = 600
+# Decayed sends per BURST_TAU that count as a burst
+BURST_RATE = 10
+# Both directions of a pair must move at least this much RC to look like wash trading...
+WASH_MIN_VOLUME = 500
+# ...and the smaller direction must be at least this share of the larger
+WASH_SYMMETRY = 0.8
+# Amount z-score flagged as an outlier, once a user has this many samples
+OUTLIER_Z = 4.0
+OUTLIER_MIN_SAMPLES = 10
+# Weight of the newest amount in the running mean/variance
+AMOUNT_ALPHA = 0.05
+# Tracked users and pairs; least recently active are dropped beyond this
+MAX_TRACKED = 50000
+# Minimum gap between two reports of the same user and reason (seconds)
+REPORT_COOLDOWN = 600
+
+
+class DecayedCounter:
+    """Exponentially decayed sum: O(1) update, no per-event history"""
+
+    __slots__ = ("value", "updated")
+
+    def __init__(self):
+        self.value = 0.0
+        self.updated = time.monotonic()
+
+    def read(self, tau: float, now: float = None):
+        now = now or time.monotonic()
+        return self.value * math.exp(-(now - self.updated) / tau)
+
+    def add(self, amount: float, tau: float, now: float = None):
+        now = now or time.monotonic()
+        self.value = self.read(tau, now) + amount
+        self.updated = now
+        return self.value
+
+
+class UserStats:
+    __slots__ = ("sends", "mean", "var", "samples")
+
+    def __init__(self):
+        self.sends = DecayedCounter()
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+
+    def zscore(self, amount: float):
+        if self.samples < OUTLIER_MIN_SAMPLES or self.var <= 0:
+            return 0.0
+        return (amount - self.mean) / math.sqrt(self.var)
+
+    def observe_amount(self, amount: float):
+        """Exponentially weighted mean and variance of sent amounts"""
+        if self.samples == 0:
+            self.mean = amount
+        else:
+            delta = amount - self.mean
+            self.mean += AMOUNT_ALPHA * delta
+            self.var = (1 - AMOUNT_ALPHA) * (self.var + AMOUNT_ALPHA * delta * delta)
+        self.samples += 1
+
+
+class LRUTable(OrderedDict):
+    """Mapping that creates missing entries and drops the least recently used"""
+
+    def __init__(self, factory, maxsize: int = MAX_TRACKED):
+        super().__init__()
+        self.factory = factory
+        self.maxsize = maxsize
+
+    def touch(self, key):
+        entry = self.get(key)
+        if entry is None:
+            entry = self[key] = self.factory()
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+        else:
+            self.move_to_end(key)
+        return entry
+
+
+class AnomalyDetector:
+    """Streaming wash-trading and velocity checks on every ledger transfer
+
+    Per-user state is a decayed send rate plus a running amount mean and
+    variance; per-pair state is one decayed volume counter per direction.
+    Every check is O(1) and both tables are LRU-bounded.
+    """
+
+    def __init__(self, bot, block: bool = False):
+        self.bot = bot
+        self.block = block
+        self.users = LRUTable(UserStats)
+        self.pairs = LRUTable(DecayedCounter)
+        self.reported = LRUTable(float)
+        # Reports being written; the loop only keeps weak references to tasks
+        self.reporting = set()
+
+    def assess(self, sender_id: int, recipient_id: int, amount: float, now: float = None):
+        """Reasons a transfer looks suspicious, without recording it"""
+        now = now or time.monotonic()
+        reasons = []
+
+        stats = self.users.get(sender_id)
+        if stats:
+            if stats.sends.read(BURST_TAU, now) + 1 > BURST_RATE:
+                reasons.append("burst")
+            z = stats.zscore(amount)
+            if z > OUTLIER_Z:
+                reasons.append(f"outlier (z={z:.1f})")
+
+        forward = self.pairs.get((sender_id, recipient_id))
+        backward = self.pairs.get((recipient_id, sender_id))
+        if backward:
+            sent = (forward.read(PAIR_TAU, now) if forward else 0) + amount
+            returned = backward.read(PAIR_TAU, now)
+            if min(sent, returned) >= WASH_MIN_VOLUME and min(sent, returned) / max(sent, returned) >= WASH_SYMMETRY:
+                reasons.append("wash")
+
+        return reasons
+
+    def should_block(self, sender_id: int, recipient_id: int, amount: float):
+        """Whether a transfer should be refused before it executes"""
+        if not self.block:
+            return False
+        now = time.monotonic()
+        reasons = self.assess(sender_id, recipient_id, amount, now)
+        if reasons:
+            self.flag(sender_id, recipient_id, amount, reasons, now, blocked=True)
+        return bool(reasons)
+
+    def observe(self, sender_id: int, recipient_id: int, amount: float):
+        """Record a completed transfer and report anything suspicious"""
+        now = time.monotonic()
+        reasons = self.assess(sender_id, recipient_id, amount, now)
+
+        stats = self.users.touch(sender_id)
+        stats.sends.add(1, BURST_TAU, now)
+        stats.observe_amount(amount)
+        self.pairs.touch((sender_id, recipient_id)).add(amount, PAIR_TAU, now)
+
+        if reasons:
+            self.flag(sender_id, recipient_id, amount, reasons, now)
+        return reasons
+
+    def flag(self, sender_id: int, recipient_id: int, amount: float, reasons: list, now: float, blocked: bool = False):
+        """Report reasons not already reported for this user recently"""
+        fresh = []
+        for reason in reasons:
+            key = (sender_id, reason.split(" ")[0])
+            if now - self.reported.get(key, -REPORT_COOLDOWN) >= REPORT_COOLDOWN:
+                self.reported.touch(key)
+                self.reported[key] = now
+                fresh.append(reason)
+
+        if fresh:
+            task = asyncio.create_task(self.report(sender_id, recipient_id, amount, fresh, blocked))
+            self.reporting.add(task)
+            task.add_done_callback(self.reporting.discard)
+
+    async def report(self, sender_id: int, recipient_id: int, amount: float, reasons: list, blocked: bool = False):
+        try:
+            await self.bot.scam_reports_col.insert_one({
+                "type": "anomaly",
+                "user_id": sender_id,
+                "counterparty_id": recipient_id,
+                "amount": amount,
+                "reasons": reasons,
+                "blocked": blocked,
+                "status": "open",
+                "detected_at": datetime.utcnow()
+            })
+            await self.bot.report_scam(
+                "🚨 Transfer Blocked" if blocked else "🚨 Suspicious Transfer",
+                f"<@{sender_id}> → <@{recipient_id}>: **{amount:,} RC**\nFlags: {', '.join(reasons)}"
+            )
+        except Exception as e:
+            logger.error(f"Error reporting anomaly: {e}")
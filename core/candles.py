@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger('RCN_Prime')
+
+# Candle resolutions, finest first
+RESOLUTIONS = {
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+    "1w": timedelta(weeks=1)
+}
+
+# Most candles a single range query should return
+MAX_CANDLES = 200
+
+
+def bucket_start(ts: datetime, resolution: str):
+    """Start of the candle that ``ts`` falls into"""
+    hour = ts.replace(minute=0, second=0, microsecond=0)
+    if resolution == "1h":
+        return hour
+    day = hour.replace(hour=0)
+    if resolution == "1d":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def pick_resolution(span: timedelta):
+    """Finest resolution that covers ``span`` in at most MAX_CANDLES candles"""
+    for resolution, width in RESOLUTIONS.items():
+        if span / width <= MAX_CANDLES:
+            return resolution
+    return list(RESOLUTIONS)[-1]
+
+
+def candle_update(resolution: str, start: datetime, price: float, ticks: int = 1,
+                  open_price: float = None, high: float = None, low: float = None):
+    """Upsert that folds one tick (or a pre-aggregated run of ticks) into a candle"""
+    return UpdateOne(
+        {"_id": f"{resolution}:{start.isoformat()}"},
+        {
+            "$setOnInsert": {"resolution": resolution, "start": start, "open": price if open_price is None else open_price},
+            "$max": {"high": price if high is None else high},
+            "$min": {"low": price if low is None else low},
+            "$set": {"close": price},
+            "$inc": {"ticks": ticks}
+        },
+        upsert=True
+    )
+
+
+class CandleRollup:
+    """Maintains 1h/1d/1w OHLC candles in ``price_candles`` as ticks are written"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def record(self, price: float, timestamp: datetime):
+        """Fold one price tick into every resolution in a single round trip"""
+        ops = [candle_update(resolution, bucket_start(timestamp, resolution), price) for resolution in RESOLUTIONS]
+        await self.bot.price_candles_col.bulk_write(ops, ordered=False)
+
+    async def backfill(self):
+        """Build candles from raw price history when none exist yet"""
+        if await self.bot.price_candles_col.estimated_document_count():
+            return
+
+        candles = {}
+        async for tick in self.bot.price_history_col.find({}, projection={"timestamp": 1, "new_price": 1}).sort("timestamp", 1):
+            price = tick["new_price"]
+            for resolution in RESOLUTIONS:
+                key = (resolution, bucket_start(tick["timestamp"], resolution))
+                candle = candles.get(key)
+                if candle is None:
+                    candles[key] = {"open": price, "high": price, "low": price, "close": price, "ticks": 1}
+                else:
+                    candle["high"] = max(candle["high"], price)
+                    candle["low"] = min(candle["low"], price)
+                    candle["close"] = price
+                    candle["ticks"] += 1
+
+        if not candles:
+            return
+
+        ops = [
+            candle_update(resolution, start, c["close"], c["ticks"], c["open"], c["high"], c["low"])
+            for (resolution, start), c in candles.items()
+        ]
+        await self.bot.price_candles_col.bulk_write(ops, ordered=False)
+        logger.info(f"🕯️ Backfilled {len(ops)} price candles from history")
+
+    async def fetch(self, start: datetime, end: datetime, resolution: str = None):
+        """Candles covering [start, end] at the given or smallest adequate resolution"""
+        resolution = resolution or pick_resolution(end - start)
+        cursor = self.bot.price_candles_col.find(
+            {"resolution": resolution, "start": {"$gte": bucket_start(start, resolution), "$lte": end}}
+        ).sort("start", 1)
+        return resolution, await cursor.to_list(length=None)
+
+    async def ensure_timeseries(self):
+        """Create price_history as a time-series collection if it does not exist yet"""
+        existing = await self.bot.db.list_collection_names(filter={"name": self.bot.price_history_col.name})
+        if existing:
+            return
+        await self.bot.db.create_collection(
+            self.bot.price_history_col.name,
+            timeseries={"timeField": "timestamp", "granularity": "hours"}
+        )
+        logger.info("🕯️ Created price_history as a time-series collection")
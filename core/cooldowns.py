@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from discord import app_commands
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from config import COOLDOWNS, FOUNDER_ID
+
+logger = logging.getLogger('RCN_Prime')
+
+# How often dirty limits are written back and expired ones evicted (seconds)
+COOLDOWN_FLUSH_INTERVAL = 30
+
+
+class CooldownEngine:
+    """Per (user, action) rate limits using the generic cell rate algorithm
+
+    Each limit is ``burst`` uses per ``per`` seconds and its whole state is one
+    number, the theoretical arrival time (TAT) of the next allowed use, so a
+    check is a dict lookup and a comparison. A key whose TAT has passed is
+    identical to a fresh one and is evicted.
+
+    Locally, state lives in memory, dirty keys are flushed to Mongo in bulk and
+    unexpired keys are reloaded at startup. In shared mode (several processes)
+    every check is one conditional upsert against Mongo instead.
+
+    A use is charged when the command's check passes; commands that turn the
+    request away afterwards (bad input, not enough RC) hand it back with
+    ``refund_cooldown``.
+    """
+
+    def __init__(self, bot, limits: dict = None, shared: bool = False):
+        self.bot = bot
+        self.shared = shared
+        self.limits = {}
+        for action, seconds in (limits or COOLDOWNS).items():
+            self.set_limit(action, 1, seconds)
+        self.tats = {}
+        self.dirty = set()
+
+    def set_limit(self, action: str, burst: int, per: float):
+        interval = per / burst
+        self.limits[action] = (interval, interval * (burst - 1))
+
+    async def hit(self, action: str, user_id: int):
+        """Consume one use; returns 0 if allowed, else seconds until the next use"""
+        if self.shared:
+            return await self.hit_shared(action, user_id)
+
+        interval, tolerance = self.limits[action]
+        now = time.time()
+        key = (action, user_id)
+        tat = max(self.tats.get(key, now), now)
+
+        if tat - now > tolerance:
+            return tat - now - tolerance
+
+        self.tats[key] = tat + interval
+        self.dirty.add(key)
+        return 0
+
+    async def hit_shared(self, action: str, user_id: int):
+        interval, tolerance = self.limits[action]
+        now = time.time()
+        doc_id = f"{action}:{user_id}"
+
+        # A key over its limit does not match, so the upsert collides on _id
+        try:
+            await self.bot.cooldowns_col.update_one(
+                {"_id": doc_id, "tat": {"$lte": now + tolerance}},
+                [
+                    {"$set": {"tat": {"$add": [{"$max": ["$tat", now]}, interval]}}},
+                    {"$set": {"expires_at": {"$toDate": {"$multiply": ["$tat", 1000]}}}}
+                ],
+                upsert=True
+            )
+            return 0
+        except DuplicateKeyError:
+            doc = await self.bot.cooldowns_col.find_one({"_id": doc_id})
+            return max(0.0, doc["tat"] - now - tolerance) if doc else 0
+
+    async def refund(self, action: str, user_id: int):
+        """Give back one use charged by ``hit``"""
+        interval, _ = self.limits[action]
+        if self.shared:
+            await self.bot.cooldowns_col.update_one({"_id": f"{action}:{user_id}"}, {"$inc": {"tat": -interval}})
+            return
+
+        key = (action, user_id)
+        if key in self.tats:
+            self.tats[key] -= interval
+            self.dirty.add(key)
+
+    async def load(self):
+        """Reload limits that have not expired yet"""
+        now = time.time()
+        async for doc in self.bot.cooldowns_col.find({"tat": {"$gt": now}}):
+            action, user_id = doc["_id"].split(":", 1)
+            if action in self.limits:
+                self.tats[(action, int(user_id))] = doc["tat"]
+
+    def evict(self):
+        now = time.time()
+        expired = [key for key, tat in self.tats.items() if tat <= now]
+        for key in expired:
+            del self.tats[key]
+            self.dirty.discard(key)
+
+    async def flush(self):
+        if not self.dirty:
+            return
+        ops = []
+        for key in self.dirty:
+            tat = self.tats.get(key)
+            if tat is None:
+                continue
+            action, user_id = key
+            ops.append(UpdateOne(
+                {"_id": f"{action}:{user_id}"},
+                {"$set": {"tat": tat, "expires_at": datetime.utcfromtimestamp(tat)}},
+                upsert=True
+            ))
+        # Keys dirtied while the write is in flight stay dirty; failed keys are retried
+        dirty, self.dirty = self.dirty, set()
+        try:
+            if ops:
+                await self.bot.cooldowns_col.bulk_write(ops, ordered=False)
+        except Exception:
+            self.dirty |= dirty
+            raise
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(COOLDOWN_FLUSH_INTERVAL)
+            try:
+                self.evict()
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing cooldowns: {e}")
+
+
+def cooldown(action: str):
+    """App command check enforcing the named limit; the founder bypasses it"""
+    async def predicate(interaction):
+        if interaction.user.id == FOUNDER_ID:
+            return True
+        engine = interaction.client.cooldowns
+        retry_after = await engine.hit(action, interaction.user.id)
+        if retry_after > 0:
+            interval, tolerance = engine.limits[action]
+            raise app_commands.CommandOnCooldown(app_commands.Cooldown(1, interval + tolerance), retry_after)
+        interaction.extras["cooldown"] = action
+        return True
+    return app_commands.check(predicate)
+
+
+async def refund_cooldown(interaction):
+    """Hand back the use charged by ``cooldown`` when a command rejects the request"""
+    action = interaction.extras.pop("cooldown", None)
+    if action is None:
+        return
+    try:
+        await interaction.client.cooldowns.refund(action, interaction.user.id)
+    except Exception as e:
+        logger.error(f"Error refunding {action} cooldown: {e}")
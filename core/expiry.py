@@ -0,0 +1,99 @@
+import asyncio
+import heapq
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+logger = logging.getLogger('RCN_Prime')
+
+# Seconds of upcoming deadlines held in memory per refill
+EXPIRY_HORIZON = 3600
+# Longest pause between retries while Mongo is failing (seconds)
+EXPIRY_MAX_BACKOFF = 300
+
+
+def now_ts():
+    # Matches how expires_at is written (datetime.utcnow().timestamp())
+    return datetime.utcnow().timestamp()
+
+
+class ExpiryScheduler:
+    """Expires documents at their ``expires_at`` deadline
+
+    Deadlines due within the next EXPIRY_HORIZON seconds are loaded from an
+    indexed ``expires_at`` query into a min-heap, and the loop sleeps exactly
+    until the earliest one (or the next refill). Each registered source is a
+    collection, a filter for live documents and the update applied on expiry.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.sources = {}
+        self.heap = []
+        self.loaded_until = 0
+        self.wakeup = asyncio.Event()
+
+    def register(self, kind: str, collection, live_filter: dict, on_expire: dict):
+        self.sources[kind] = (collection, live_filter, on_expire)
+
+    def schedule(self, kind: str, doc_id, deadline: float):
+        """Track a deadline created after the last refill"""
+        if deadline > self.loaded_until:
+            # The next refill picks it up
+            return
+        heapq.heappush(self.heap, (deadline, kind, doc_id))
+        self.wakeup.set()
+
+    async def refill(self, now: float):
+        horizon = now + EXPIRY_HORIZON
+        heap = []
+        for kind, (collection, live_filter, _) in self.sources.items():
+            query = {**live_filter, "expires_at": {"$lte": horizon}}
+            async for doc in collection.find(query, projection={"expires_at": 1}):
+                heap.append((doc["expires_at"], kind, doc["_id"]))
+        heapq.heapify(heap)
+        self.heap = heap
+        self.loaded_until = horizon
+
+    async def expire_due(self, now: float):
+        due = defaultdict(list)
+        while self.heap and self.heap[0][0] <= now:
+            _, kind, doc_id = heapq.heappop(self.heap)
+            due[kind].append(doc_id)
+
+        for kind, ids in due.items():
+            collection, live_filter, on_expire = self.sources[kind]
+            result = await collection.update_many(
+                {**live_filter, "_id": {"$in": ids}, "expires_at": {"$lte": now}},
+                on_expire
+            )
+            if result.modified_count > 0:
+                logger.info(f"⌛ Expired {result.modified_count} {kind} entries")
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        failures = 0
+
+        while not self.bot.is_closed():
+            with self.bot.perf.tick("expiry"):
+                try:
+                    now = now_ts()
+                    if now >= self.loaded_until:
+                        await self.refill(now)
+                    await self.expire_due(now)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"Error in expiry scheduler: {e}")
+
+            if failures:
+                # A failed refill or expiry would otherwise be retried at once
+                await asyncio.sleep(min(2 ** (failures - 1), EXPIRY_MAX_BACKOFF))
+                continue
+
+            next_deadline = min(self.heap[0][0], self.loaded_until) if self.heap else self.loaded_until
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=max(0, next_deadline - now_ts()))
+            except asyncio.TimeoutError:
+                pass
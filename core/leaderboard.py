@@ -0,0 +1,103 @@
+import asyncio
+import logging
+
+from sortedcontainers import SortedList
+
+logger = logging.getLogger('RCN_Prime')
+
+# Boards and their display names
+BOARDS = {
+    "rc_balance": "RC Balance",
+    "trust_score": "Trust Score",
+    "reviews_given": "Reviews Given",
+    "posts_created": "Posts Created"
+}
+
+# Full rebuild interval, correcting any drift from missed updates (seconds)
+LEADERBOARD_REBUILD_INTERVAL = 3600
+
+
+class Leaderboard:
+    """Scores kept in a sorted list for O(log n) updates and rank lookups"""
+
+    def __init__(self):
+        self.scores = {}
+        self.ranked = SortedList()  # (-score, user_id), best first
+
+    def __len__(self):
+        return len(self.ranked)
+
+    def set(self, user_id: int, score: float):
+        old = self.scores.get(user_id)
+        if old is not None:
+            self.ranked.remove((-old, user_id))
+        self.scores[user_id] = score
+        self.ranked.add((-score, user_id))
+
+    def adjust(self, user_id: int, delta: float):
+        self.set(user_id, self.scores.get(user_id, 0) + delta)
+
+    def load(self, scores: dict):
+        self.scores = dict(scores)
+        self.ranked = SortedList((-score, user_id) for user_id, score in self.scores.items())
+
+    def rank(self, user_id: int):
+        """1-based rank, or None for users not on the board"""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self.ranked.bisect_left((-score, user_id)) + 1
+
+    def top(self, n: int = 10):
+        return [(user_id, -neg_score) for neg_score, user_id in self.ranked.islice(0, n)]
+
+
+class LeaderboardService:
+    """In-memory leaderboards updated by balance, post and review mutations"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.boards = {name: Leaderboard() for name in BOARDS}
+
+    def adjust(self, board: str, user_id: int, delta: float):
+        if user_id != self.bot.FOUNDER_ID:
+            self.boards[board].adjust(user_id, delta)
+
+    def set(self, board: str, user_id: int, score: float):
+        if user_id != self.bot.FOUNDER_ID:
+            self.boards[board].set(user_id, score)
+
+    async def rebuild(self):
+        """Recompute every board from Mongo"""
+        balances, trust = {}, {}
+        async for user in self.bot.users_col.find(
+            {"is_founder": {"$ne": True}},
+            projection={"rc_balance": 1, "trust_score": 1}
+        ):
+            balances[user["_id"]] = user.get("rc_balance", 0)
+            trust[user["_id"]] = user.get("trust_score", 0)
+
+        posts = await self.count_by(self.bot.posts_col, "author_id")
+        reviews = await self.count_by(self.bot.reviews_col, "reviewer_id")
+
+        self.boards["rc_balance"].load(balances)
+        self.boards["trust_score"].load(trust)
+        self.boards["posts_created"].load(posts)
+        self.boards["reviews_given"].load(reviews)
+        logger.info(f"🏆 Rebuilt leaderboards ({len(balances)} users)")
+
+    async def count_by(self, collection, field: str):
+        pipeline = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        return {
+            row["_id"]: row["count"]
+            async for row in collection.aggregate(pipeline)
+            if row["_id"] is not None and row["_id"] != self.bot.FOUNDER_ID
+        }
+
+    async def run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Error rebuilding leaderboards: {e}")
+            await asyncio.sleep(LEADERBOARD_REBUILD_INTERVAL)
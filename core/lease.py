@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger('RCN_Prime')
+
+# Seconds a lease stays valid without renewal
+LEASE_TTL = 30
+# Renew (or retry acquiring) this many times per TTL
+LEASE_RENEWALS_PER_TTL = 3
+
+
+class Lease:
+    """A named lock in Mongo held by one process at a time
+
+    Acquiring is a single upsert that only matches while the lease is free,
+    expired or already ours; if another holder's lease is still valid the
+    upsert collides on ``_id`` and fails. Renewing is the same call.
+    """
+
+    def __init__(self, bot, name: str, holder: str, ttl: int = LEASE_TTL):
+        self.bot = bot
+        self.name = name
+        self.holder = holder
+        self.ttl = ttl
+
+    async def acquire(self):
+        now = datetime.utcnow()
+        try:
+            await self.bot.leases_col.update_one(
+                {"_id": self.name, "$or": [{"holder": self.holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": self.holder, "expires_at": now + timedelta(seconds=self.ttl), "renewed_at": now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def release(self):
+        await self.bot.leases_col.delete_one({"_id": self.name, "holder": self.holder})
+
+
+class LeaseManager:
+    """Runs singleton background jobs in exactly one process
+
+    Every process calls ``exclusive`` for the same jobs. The process holding
+    a job's lease runs it and keeps renewing; the others keep trying to take
+    the lease over, so when the holder dies or stops renewing another process
+    starts the job within one TTL.
+    """
+
+    def __init__(self, bot, ttl: int = LEASE_TTL):
+        self.bot = bot
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.held = {}
+
+    def exclusive(self, name: str, job):
+        """Run ``job()`` (a coroutine function) while this process holds ``name``"""
+        return asyncio.create_task(self.supervise(Lease(self.bot, name, self.holder, self.ttl), job))
+
+    async def supervise(self, lease: Lease, job):
+        interval = self.ttl / LEASE_RENEWALS_PER_TTL
+        loop = asyncio.get_running_loop()
+
+        while not self.bot.is_closed():
+            try:
+                acquired = await lease.acquire()
+            except Exception as e:
+                logger.error(f"Error acquiring lease {lease.name}: {e}")
+                acquired = False
+            if not acquired:
+                await asyncio.sleep(interval)
+                continue
+
+            logger.info(f"👑 Acquired lease {lease.name}, starting job")
+            valid_until = loop.time() + self.ttl
+            task = asyncio.create_task(job())
+            self.held[lease.name] = lease
+
+            try:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=interval)
+                    if done:
+                        break
+                    try:
+                        renewed = await lease.acquire()
+                    except Exception as e:
+                        logger.error(f"Error renewing lease {lease.name}: {e}")
+                        # Keep running while the lease we hold can't have expired yet
+                        renewed = loop.time() < valid_until - interval
+                    else:
+                        if renewed:
+                            valid_until = loop.time() + self.ttl
+                    if not renewed:
+                        logger.warning(f"Lost lease {lease.name}, stopping job")
+                        task.cancel()
+                        break
+            finally:
+                self.held.pop(lease.name, None)
+                if not task.done():
+                    task.cancel()
+
+            if task.done() and not task.cancelled():
+                if task.exception():
+                    logger.error(f"Job {lease.name} crashed: {task.exception()}")
+                    await asyncio.sleep(interval)
+                else:
+                    # One-shot jobs finish; hand the lease back
+                    await lease.release()
+                    return
+
+    async def release_all(self):
+        """Give up every held lease so another process can take over at once"""
+        for lease in list(self.held.values()):
+            try:
+                await lease.release()
+            except Exception as e:
+                logger.error(f"Error releasing lease {lease.name}: {e}")
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import bson
+from bson.errors import InvalidDocument
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure, PyMongoError
+
+from config import TAX_RATES
+
+logger = logging.getLogger('RCN_Prime')
+
+# Flush once this many entries are queued...
+LEDGER_BATCH_SIZE = 500
+# ...or once the oldest queued entry has waited this long (seconds)
+LEDGER_FLUSH_INTERVAL = 0.25
+# Writers block once this many entries are waiting to be written
+LEDGER_MAX_PENDING = 10000
+# Longest pause between retries while Mongo is failing
+LEDGER_MAX_BACKOFF = 30
+# Attempts made for a failing batch once the bot is shutting down
+LEDGER_SHUTDOWN_RETRIES = 3
+
+
+class LedgerWriter:
+    """Write-behind queue that coalesces ledger entries into insert_many batches
+
+    ``write`` returns as soon as the entry is queued. Entries written with
+    ``durable=True`` trigger an immediate flush and only return once Mongo has
+    acknowledged the batch containing them. The queue is bounded, so when Mongo
+    falls behind callers wait in ``write`` instead of buffering without limit.
+
+    Only network and other transient failures are retried. Duplicate keys mean
+    the entry already landed (pymongo assigns ``_id`` before the first
+    attempt), and entries Mongo rejects outright are moved to
+    ``ledger_dead_letters`` so one bad entry can't stall the queue.
+    """
+
+    def __init__(self, collection, batch_size: int = LEDGER_BATCH_SIZE,
+                 flush_interval: float = LEDGER_FLUSH_INTERVAL,
+                 max_pending: int = LEDGER_MAX_PENDING):
+        self.collection = collection
+        self.dead_letters = collection.database.ledger_dead_letters
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.task = None
+        self.closed = False
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def write(self, entry: dict, durable: bool = False):
+        """Queue a ledger entry, waiting for the write to land if durable"""
+        if self.closed:
+            # Shutting down, nothing will drain the queue any more
+            await self.collection.insert_one(entry)
+            return
+
+        future = asyncio.get_running_loop().create_future() if durable else None
+        await self.queue.put((entry, future))
+        if future:
+            await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                # Durable entries are flushed as soon as the queue is drained
+                durable = any(future for _, future in batch)
+                try:
+                    if durable:
+                        item = self.queue.get_nowait()
+                    else:
+                        item = await asyncio.wait_for(self.queue.get(), max(0, deadline - loop.time()))
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self.flush(batch)
+
+    async def flush(self, batch: list):
+        """Insert one batch, retrying transient failures with backoff"""
+        pending = batch
+        attempt = 0
+
+        while pending:
+            docs = [entry for entry, _ in pending]
+            rejected = {}
+            retry = None
+            try:
+                await self.collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                rejected = {
+                    err["index"]: err.get("errmsg", "write error")
+                    for err in e.details.get("writeErrors", [])
+                    if err.get("code") != 11000
+                }
+                if e.details.get("writeConcernErrors"):
+                    retry = e
+            except InvalidDocument:
+                # Raised before anything is sent; find the entries that can't be encoded
+                rejected = {i: error for i, doc in enumerate(docs) if (error := encode_error(doc))}
+                if rejected:
+                    retry = "valid entries"
+                else:
+                    rejected = {i: "invalid document" for i in range(len(docs))}
+            except Exception as e:
+                if is_transient(e):
+                    retry = e
+                else:
+                    rejected = {i: str(e) for i in range(len(docs))}
+
+            if rejected:
+                await self.dead_letter([(pending[i], reason) for i, reason in rejected.items()])
+                pending = [item for i, item in enumerate(pending) if i not in rejected]
+
+            if retry is None:
+                break
+            if isinstance(retry, str):
+                continue
+
+            attempt += 1
+            if self.closed and attempt >= LEDGER_SHUTDOWN_RETRIES:
+                logger.error(f"Dropping {len(pending)} ledger entries on shutdown: {retry}")
+                for _, future in pending:
+                    if future and not future.done():
+                        future.set_exception(retry)
+                return
+            delay = min(0.5 * 2 ** (attempt - 1), LEDGER_MAX_BACKOFF)
+            logger.warning(f"Ledger flush of {len(pending)} entries failed, retrying in {delay:.1f}s: {retry}")
+            await asyncio.sleep(delay)
+
+        for _, future in pending:
+            if future and not future.done():
+                future.set_result(None)
+
+    async def dead_letter(self, rejected: list):
+        """Record entries Mongo will never accept and fail their writers"""
+        logger.error(f"Moving {len(rejected)} rejected ledger entries to ledger_dead_letters: {rejected[0][1]}")
+        now = datetime.utcnow()
+        for (_, future), reason in rejected:
+            if future and not future.done():
+                future.set_exception(LedgerEntryRejected(reason))
+        try:
+            await self.dead_letters.insert_many([
+                {"entry": repr(entry), "error": reason, "failed_at": now}
+                for (entry, _), reason in rejected
+            ])
+        except Exception as e:
+            logger.error(f"Error writing ledger dead letters: {e}")
+
+    async def close(self):
+        """Flush everything queued and stop the writer"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.task:
+            await self.queue.put(None)
+            await self.task
+
+
+def is_transient(error: Exception):
+    """Whether retrying the same write can succeed"""
+    return isinstance(error, ConnectionFailure) or (
+        isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+    )
+
+
+def encode_error(doc: dict):
+    try:
+        bson.encode(doc)
+    except InvalidDocument as e:
+        return str(e)
+    return None
+
+
+class LedgerEntryRejected(Exception):
+    """Raised to a durable writer whose entry Mongo refused to store"""
+
+
+class InsufficientFunds(Exception):
+    """Raised when a transfer's sender cannot cover the amount"""
+
+
+class TransferBlocked(Exception):
+    """Raised when the anomaly detector refuses a transfer"""
+
+
+async def transfer(bot, sender: dict, recipient_id: int, recipient_name: str, amount: int,
+                   tx_type: str = "payment", details: dict = None):
+    """Move RC from ``sender`` (a user document) to another user
+
+    The debit, credit, treasury update and both ledger rows share a
+    transaction where the deployment supports them. The debit only matches
+    while the balance covers the amount; a miss aborts the transaction, so
+    concurrent transfers cannot overdraw. The sender document must already
+    exist. The recipient is created on first credit.
+
+    Standalone servers fall back to one ordered ``bulk_write`` for the
+    balances, where the debit is an upsert so a failed match becomes a
+    duplicate key error that aborts the bulk before the credit is applied,
+    followed by the treasury update and durable ledger writes.
+
+    Returns a dict with the tax rate, tax and net amount credited.
+    """
+    sender_id = sender["_id"]
+    sender_is_founder = sender_id == bot.FOUNDER_ID
+    recipient_is_founder = recipient_id == bot.FOUNDER_ID
+
+    if sender_is_founder:
+        tax_rate = TAX_RATES["founder"]
+    else:
+        tax_rate = TAX_RATES.get(sender.get("premium_tier"), TAX_RATES["normal"])
+    tax_amount = int(amount * tax_rate)
+    net_amount = amount - tax_amount
+
+    if not sender_is_founder and bot.anomalies.should_block(sender_id, recipient_id, amount):
+        raise TransferBlocked()
+
+    debit_filter = {"_id": sender_id, "rc_balance": {"$gte": amount}}
+    debit = {"$inc": {"rc_balance": -amount}}
+    new_user = bot.new_user_document(recipient_id, recipient_name)
+    del new_user["rc_balance"]
+    credit = {"$inc": {"rc_balance": net_amount}, "$setOnInsert": new_user}
+
+    # RC held by the founder is outside circulating supply
+    circulating = (0 if sender_is_founder else -amount) + (0 if recipient_is_founder else net_amount)
+    minted = amount if sender_is_founder else 0
+
+    entries = [
+        bot.transaction_entry(sender_id, tx_type, -amount, {
+            "to": recipient_id,
+            "tax": tax_amount,
+            "net_sent": net_amount,
+            **(details or {})
+        }),
+        bot.transaction_entry(recipient_id, f"{tx_type}_received", net_amount, {
+            "from": sender_id,
+            "original_amount": amount,
+            "tax": tax_amount,
+            **(details or {})
+        })
+    ]
+
+    async def write(session):
+        if not sender_is_founder:
+            result = await bot.users_col.update_one(debit_filter, debit, session=session)
+            if not result.matched_count:
+                raise InsufficientFunds()
+        await bot.users_col.update_one({"_id": recipient_id}, credit, upsert=True, session=session)
+        supply_ops = bot.supply_ops(circulating, minted, tax_amount)
+        if supply_ops:
+            await bot.treasury_col.bulk_write(supply_ops, ordered=False, session=session)
+        # Fresh copies so a retried transaction doesn't reuse the _ids of an aborted attempt
+        await bot.transactions_col.insert_many([dict(entry) for entry in entries], session=session)
+
+    async def write_standalone():
+        ops = []
+        if not sender_is_founder:
+            ops.append(UpdateOne(debit_filter, debit, upsert=True))
+        ops.append(UpdateOne({"_id": recipient_id}, credit, upsert=True))
+        try:
+            await bot.users_col.bulk_write(ops, ordered=True)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if not sender_is_founder and errors and errors[0]["index"] == 0 and errors[0]["code"] == 11000:
+                raise InsufficientFunds()
+            raise
+        supply_ops = bot.supply_ops(circulating, minted, tax_amount)
+        if supply_ops:
+            await bot.treasury_col.bulk_write(supply_ops, ordered=False)
+        # Queued together so both rows land in the same batch
+        await asyncio.gather(*(bot.ledger.write(entry, durable=True) for entry in entries))
+
+    try:
+        try:
+            async with await bot.client.start_session() as session:
+                await session.with_transaction(write)
+        except OperationFailure as e:
+            # IllegalOperation: transactions need a replica set
+            if e.code != 20:
+                raise
+            await write_standalone()
+    finally:
+        bot.user_cache.invalidate(sender_id, recipient_id)
+
+    bot.circulating_supply += circulating
+    bot.leaderboards.adjust("rc_balance", sender_id, -amount)
+    bot.leaderboards.adjust("rc_balance", recipient_id, net_amount)
+    for entry in entries:
+        bot.observe_transaction(entry)
+
+    return {"tax_rate": tax_rate, "tax": tax_amount, "net": net_amount}
@@ -0,0 +1,144 @@
+import logging
+from datetime import datetime, timedelta
+
+from core.metrics import WHALE_THRESHOLD, METRICS_WINDOW
+
+logger = logging.getLogger('RCN_Prime')
+
+EPOCH = datetime(1970, 1, 1)
+
+# How often the window is written back to Mongo
+CHECKPOINT_INTERVAL = 300
+
+# Bucket field order
+TX_COUNT, TRADE_COUNT, TRADE_VOLUME, WHALE_TRADES = range(4)
+
+
+def minute_of(ts: datetime):
+    """Minutes since the epoch for a naive UTC datetime"""
+    return int((ts - EPOCH).total_seconds() // 60)
+
+
+class RollingMarketWindow:
+    """Sliding window of per-minute ledger counters
+
+    Buckets live in a ring indexed by ``minute % size`` and running totals are
+    kept alongside, so recording a transaction and reading the window are both
+    O(1) (amortized over the buckets expired as time advances).
+    """
+
+    def __init__(self, window: timedelta = METRICS_WINDOW):
+        self.size = int(window.total_seconds() // 60)
+        self.reset()
+
+    def reset(self):
+        self.buckets = [[0, 0, 0, 0] for _ in range(self.size)]
+        self.bucket_minutes = [None] * self.size
+        self.totals = [0, 0, 0, 0]
+        self.head = None
+
+    def advance(self, minute: int):
+        """Move the window forward, expiring buckets that fell out of it"""
+        if self.head is None:
+            self.head = minute
+            return
+        if minute <= self.head:
+            return
+
+        if minute - self.head >= self.size:
+            self.reset()
+            self.head = minute
+            return
+
+        for m in range(self.head + 1, minute + 1):
+            slot = m % self.size
+            if self.bucket_minutes[slot] is not None:
+                bucket = self.buckets[slot]
+                for i in range(4):
+                    self.totals[i] -= bucket[i]
+                self.buckets[slot] = [0, 0, 0, 0]
+                self.bucket_minutes[slot] = None
+        self.head = minute
+
+    def add(self, minute: int, tx_count=0, trade_count=0, trade_volume=0, whale_trades=0):
+        """Add counts to the bucket for ``minute``"""
+        self.advance(minute)
+        if minute <= self.head - self.size:
+            return
+
+        slot = minute % self.size
+        self.bucket_minutes[slot] = minute
+        bucket = self.buckets[slot]
+        for i, value in enumerate((tx_count, trade_count, trade_volume, whale_trades)):
+            bucket[i] += value
+            self.totals[i] += value
+
+    def record(self, tx_type: str, amount: float, timestamp: datetime):
+        """Feed a single ledger entry into the window"""
+        is_trade = tx_type == "trade"
+        amount = abs(amount)
+        self.add(
+            minute_of(timestamp),
+            tx_count=1,
+            trade_count=1 if is_trade else 0,
+            trade_volume=amount if is_trade else 0,
+            whale_trades=1 if is_trade and amount > WHALE_THRESHOLD else 0
+        )
+
+    def read(self, now: datetime = None):
+        """Return (tx_count, trade_count, trade_volume, whale_trades) for the window"""
+        self.advance(minute_of(now or datetime.utcnow()))
+        return tuple(self.totals)
+
+    async def checkpoint(self, bot):
+        """Persist the non-empty buckets to Mongo"""
+        now = datetime.utcnow()
+        self.advance(minute_of(now))
+        buckets = [
+            [self.bucket_minutes[slot]] + self.buckets[slot]
+            for slot in range(self.size)
+            if self.bucket_minutes[slot] is not None
+        ]
+        await bot.market_state_col.update_one(
+            {"_id": "rolling_window"},
+            {"$set": {"as_of": now, "buckets": buckets}},
+            upsert=True
+        )
+
+    async def restore(self, bot):
+        """Rebuild the window from the last checkpoint plus the ledger since then"""
+        self.reset()
+        now = datetime.utcnow()
+        since = now - timedelta(minutes=self.size)
+
+        state = await bot.market_state_col.find_one({"_id": "rolling_window"})
+        if state and state["as_of"] > since:
+            for minute, *counts in state["buckets"]:
+                self.add(minute, *counts)
+            since = state["as_of"]
+
+        pipeline = [
+            {"$match": {"timestamp": {"$gt": since}}},
+            {"$project": {
+                "minute": {"$floor": {"$divide": [{"$toLong": "$timestamp"}, 60000]}},
+                "is_trade": {"$eq": ["$type", "trade"]},
+                "amount": {"$abs": "$amount"}
+            }},
+            {"$group": {
+                "_id": "$minute",
+                "tx_count": {"$sum": 1},
+                "trade_count": {"$sum": {"$cond": ["$is_trade", 1, 0]}},
+                "trade_volume": {"$sum": {"$cond": ["$is_trade", "$amount", 0]}},
+                "whale_trades": {"$sum": {"$cond": [
+                    {"$and": ["$is_trade", {"$gt": ["$amount", WHALE_THRESHOLD]}]}, 1, 0
+                ]}}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        replayed = 0
+        async for row in bot.transactions_col.aggregate(pipeline):
+            self.add(int(row["_id"]), row["tx_count"], row["trade_count"], row["trade_volume"], row["whale_trades"])
+            replayed += row["tx_count"]
+
+        self.advance(minute_of(now))
+        logger.info(f"📊 Market window restored ({self.totals[TX_COUNT]} tx in window, {replayed} replayed from ledger)")
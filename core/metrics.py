@@ -0,0 +1,133 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# Trades above this amount count as whale movement
+WHALE_THRESHOLD = 500
+
+# Window the hourly price tick looks back over
+METRICS_WINDOW = timedelta(hours=24)
+
+# Ledger rows, trade volume and trade count that max out their 0-1 score
+ACTIVITY_SCALE = 100
+VOLUME_SCALE = 10000
+VELOCITY_SCALE = 50
+
+# Weights of activity, trade volume, active posts and reviews in demand
+DEMAND_WEIGHTS = (0.3, 0.4, 0.2, 0.1)
+
+# Price formula coefficients
+DEMAND_WEIGHT = 0.5
+SUPPLY_WEIGHT = 0.000001
+WHALE_BUMP = 0.8
+PRICE_FLOOR = 0.01
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Raw market metrics for one price tick"""
+    tx_count: int = 0
+    trade_count: int = 0
+    trade_volume: float = 0
+    whale_trades: int = 0
+    active_posts: int = 0
+    total_reviews: int = 0
+    total_supply: float = 0
+
+    @property
+    def user_activity(self):
+        """Ledger activity normalized to 0-1"""
+        return min(self.tx_count / ACTIVITY_SCALE, 1.0)
+
+    @property
+    def trade_volume_score(self):
+        """Trade volume normalized to 0-1"""
+        return min(self.trade_volume / VOLUME_SCALE, 1.0)
+
+    @property
+    def coin_velocity(self):
+        """Trade count normalized to 0-1"""
+        return min(self.trade_count / VELOCITY_SCALE, 1.0)
+
+    @property
+    def whale_movement(self):
+        return self.whale_trades > 0
+
+    @property
+    def demand(self):
+        activity, volume, posts, reviews = DEMAND_WEIGHTS
+        return (self.user_activity * activity + self.trade_volume_score * volume
+                + self.active_posts * posts + self.total_reviews * reviews)
+
+
+def next_price(old_price: float, snapshot: MarketSnapshot, noise: float,
+               demand_weight: float = DEMAND_WEIGHT, supply_weight: float = SUPPLY_WEIGHT,
+               whale_bump: float = WHALE_BUMP, floor: float = PRICE_FLOOR):
+    """Apply the price formula to one snapshot"""
+    whale_factor = 1 if snapshot.whale_movement else 0
+    new_price = (old_price + snapshot.demand * demand_weight
+                 - snapshot.total_supply * supply_weight
+                 + whale_factor * whale_bump + noise)
+    return max(floor, new_price)
+
+
+def snapshot_pipeline(bot, since: datetime):
+    """Single aggregation over the transactions time range yielding every metric
+
+    Other collections are pulled in with ``$unionWith`` and tagged with ``src``
+    so one ``$facet`` stage computes all metrics in a single round trip.
+    New metrics are new facet branches.
+    """
+    return [
+        {"$match": {"timestamp": {"$gte": since}}},
+        {"$project": {"_id": 0, "src": {"$literal": "tx"}, "type": 1, "amount": {"$abs": "$amount"}}},
+        {"$unionWith": {"coll": bot.posts_col.name, "pipeline": [
+            {"$match": {"status": "active"}},
+            {"$project": {"_id": 0, "src": {"$literal": "post"}}}
+        ]}},
+        {"$unionWith": {"coll": bot.reviews_col.name, "pipeline": [
+            {"$project": {"_id": 0, "src": {"$literal": "review"}}}
+        ]}},
+        {"$facet": {
+            "transactions": [{"$match": {"src": "tx"}}, {"$count": "n"}],
+            "trades": [
+                {"$match": {"src": "tx", "type": "trade"}},
+                {"$group": {
+                    "_id": None,
+                    "n": {"$sum": 1},
+                    "volume": {"$sum": "$amount"},
+                    "whales": {"$sum": {"$cond": [{"$gt": ["$amount", WHALE_THRESHOLD]}, 1, 0]}}
+                }}
+            ],
+            "posts": [{"$match": {"src": "post"}}, {"$count": "n"}],
+            "reviews": [{"$match": {"src": "review"}}, {"$count": "n"}]
+        }}
+    ]
+
+
+async def collect_market_snapshot(bot, now: datetime = None):
+    """Run the metrics pipeline and return a MarketSnapshot
+
+    Circulating supply comes from the treasury counter rather than a scan of
+    every user's balance.
+    """
+    since = (now or datetime.utcnow()) - METRICS_WINDOW
+    result, supply = await asyncio.gather(
+        bot.transactions_col.aggregate(snapshot_pipeline(bot, since)).to_list(length=1),
+        bot.treasury_col.find_one({"_id": "supply"}, projection={"circulating": 1})
+    )
+    facets = result[0] if result else {}
+
+    def first(name, field="n"):
+        rows = facets.get(name) or []
+        return rows[0].get(field, 0) if rows else 0
+
+    return MarketSnapshot(
+        tx_count=first("transactions"),
+        trade_count=first("trades"),
+        trade_volume=first("trades", "volume"),
+        whale_trades=first("trades", "whales"),
+        active_posts=first("posts"),
+        total_reviews=first("reviews"),
+        total_supply=supply["circulating"] if supply else 0
+    )
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from config import DAILY_MISSIONS
+
+logger = logging.getLogger('RCN_Prime')
+
+# One bit per DAILY_MISSIONS entry, by position
+MISSION_BITS = {mission: 1 << index for index, mission in enumerate(DAILY_MISSIONS)}
+
+# How often completed missions are written and rewarded (seconds)
+MISSION_FLUSH_INTERVAL = 60
+
+
+def today():
+    return datetime.utcnow().date().isoformat()
+
+
+class MissionTracker:
+    """Per-user daily mission progress as a bitset, flushed to Mongo in bulk
+
+    ``complete`` is an in-memory bit test-and-set, so gateway events cost no
+    database work. Every flush writes the dirty users' ``mission_completions``
+    ({day, mask}) and grants the rewards for bits set since the last flush.
+    Each reward is a guarded ``$inc`` that also sets the mission's bit and only
+    applies while the bit is clear, so a mission is never paid twice a day.
+    Ledger rows have deterministic ids and are written after the payout.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.day = today()
+        self.masks = {}
+        self.pending = {}
+        self.names = {}
+
+    def rollover(self):
+        day = today()
+        if day != self.day:
+            self.day = day
+            self.masks.clear()
+
+    def complete(self, user_id: int, mission: str, username: str):
+        """Mark a mission done for today; returns True if it was new"""
+        if user_id == self.bot.FOUNDER_ID:
+            return False
+        self.rollover()
+        bit = MISSION_BITS[mission]
+        mask = self.masks.get(user_id, 0)
+        if mask & bit:
+            return False
+        self.masks[user_id] = mask | bit
+        self.pending[(user_id, self.day)] = self.pending.get((user_id, self.day), 0) | bit
+        self.names[user_id] = username
+        return True
+
+    def completed(self, user_id: int):
+        """Missions the user has completed today"""
+        self.rollover()
+        mask = self.masks.get(user_id, 0)
+        return [mission for mission, bit in MISSION_BITS.items() if mask & bit]
+
+    async def load(self):
+        """Restore today's progress"""
+        self.rollover()
+        async for user in self.bot.users_col.find(
+            {"mission_completions.day": self.day},
+            projection={"mission_completions": 1}
+        ):
+            self.masks[user["_id"]] = user["mission_completions"]["mask"]
+
+    async def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        names, self.names = self.names, {}
+        try:
+            await self.grant(pending, names)
+        except Exception:
+            # Retry on the next flush; missions whose bit is already set are not paid twice
+            for key, bits in pending.items():
+                self.pending[key] = self.pending.get(key, 0) | bits
+            self.names = {**names, **self.names}
+            raise
+
+    async def grant(self, pending: dict, names: dict):
+        now = datetime.utcnow()
+        # Tags the missions this flush pays, to tell them apart from earlier payouts
+        flush_id = ObjectId()
+
+        rows = []
+        for (user_id, day), bits in pending.items():
+            for mission, bit in MISSION_BITS.items():
+                if bits & bit:
+                    rows.append((user_id, day, mission))
+
+        # Start each user's day, creating the user on first completion. Days
+        # that already started (or a later one did) collide on _id and are skipped
+        day_ops = []
+        for (user_id, day) in pending:
+            new_user = self.bot.new_user_document(user_id, names.get(user_id))
+            for field in ("_id", "mission_completions"):
+                del new_user[field]
+            day_ops.append(UpdateOne(
+                {"_id": user_id, "mission_completions.day": {"$not": {"$gte": day}}},
+                {"$set": {"mission_completions": {"day": day, "mask": 0}}, "$setOnInsert": new_user},
+                upsert=True
+            ))
+        try:
+            await self.bot.users_col.bulk_write(day_ops, ordered=False)
+        except BulkWriteError as e:
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+        # Pay each mission only while its bit is still clear for that day
+        user_ops = [
+            UpdateOne(
+                {
+                    "_id": user_id,
+                    "mission_completions.day": day,
+                    "mission_completions.mask": {"$bitsAllClear": MISSION_BITS[mission]}
+                },
+                {
+                    "$bit": {"mission_completions.mask": {"or": MISSION_BITS[mission]}},
+                    "$set": {f"mission_completions.paid.{mission}": flush_id},
+                    "$inc": {"rc_balance": DAILY_MISSIONS[mission]}
+                }
+            )
+            for user_id, day, mission in rows
+        ]
+        result = await self.bot.users_col.bulk_write(user_ops, ordered=False)
+
+        recorded = paid = rows
+        if result.modified_count != len(rows):
+            # Some bits were set by an earlier flush (paid, but maybe without
+            # ledger rows) or their day was overwritten; log what is marked
+            # and account for what this flush paid
+            completions = {}
+            async for user in self.bot.users_col.find(
+                {"_id": {"$in": list({user_id for user_id, _, _ in rows})}},
+                projection={"mission_completions": 1}
+            ):
+                done = user.get("mission_completions") or {}
+                completions[(user["_id"], done.get("day"))] = done
+            recorded, paid = [], []
+            for user_id, day, mission in rows:
+                done = completions.get((user_id, day), {})
+                if done.get("mask", 0) & MISSION_BITS[mission]:
+                    recorded.append((user_id, day, mission))
+                if done.get("paid", {}).get(mission) == flush_id:
+                    paid.append((user_id, day, mission))
+            logger.warning(f"Daily mission flush paid {len(paid)} of {len(rows)} missions, the rest were paid earlier")
+
+        # Account for the payout before the ledger write, which a failed flush
+        # retries without paying (or counting) anything again
+        rewards = {}
+        for user_id, day, mission in paid:
+            rewards[user_id] = rewards.get(user_id, 0) + DAILY_MISSIONS[mission]
+            self.bot.market.record("mission_reward", DAILY_MISSIONS[mission], now)
+
+        for user_id, _ in pending:
+            self.bot.user_cache.invalidate(user_id)
+        total = sum(rewards.values())
+        for user_id, reward in rewards.items():
+            self.bot.leaderboards.adjust("rc_balance", user_id, reward)
+        if total:
+            await self.bot.record_supply_change(circulating=total, minted=total)
+            logger.info(f"🎯 Granted {len(paid)} daily missions ({total:,} RC) to {len(rewards)} users")
+
+        ledger_ops = [
+            InsertOne({
+                "_id": f"daily:{day}:{user_id}:{mission}",
+                "user_id": user_id,
+                "type": "mission_reward",
+                "amount": DAILY_MISSIONS[mission],
+                "details": {"mission": mission, "day": day},
+                "timestamp": now
+            })
+            for user_id, day, mission in recorded
+        ]
+        if ledger_ops:
+            try:
+                await self.bot.transactions_col.bulk_write(ledger_ops, ordered=False)
+            except BulkWriteError as e:
+                # Rows already written by an earlier flush
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(MISSION_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing mission progress: {e}")
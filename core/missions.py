@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from config import WEEKLY_MISSIONS
+
+logger = logging.getLogger('RCN_Prime')
+
+# Pipeline metric for each weekly mission
+WEEKLY_METRICS = {
+    "contributor": "top_contributor",
+    "reviewer": "top_reviewer",
+    "helpful": "most_helpful"
+}
+
+# Reviews at or above this rating count towards most_helpful
+HELPFUL_RATING = 4
+
+
+def week_start(ts: datetime):
+    """Monday 00:00 UTC of the week containing ``ts``"""
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def weekly_pipeline(bot, start: datetime, end: datetime):
+    """One aggregation ranking every weekly metric for [start, end)
+
+    Ledger help_someone completions, reviews and posts are tagged with the
+    metric they feed, counted per (metric, user) and reduced to the leader of
+    each metric.
+    """
+    in_week = {"$gte": start, "$lt": end}
+    return [
+        {"$match": {"type": "mission_reward", "details.mission": "help_someone", "timestamp": in_week}},
+        {"$project": {"_id": 0, "metric": {"$literal": "helpful"}, "user": "$user_id"}},
+        {"$unionWith": {"coll": bot.reviews_col.name, "pipeline": [
+            {"$match": {"created_at": in_week}},
+            {"$project": {"_id": 0, "metric": {"$literal": "reviewer"}, "user": "$reviewer_id"}}
+        ]}},
+        {"$unionWith": {"coll": bot.reviews_col.name, "pipeline": [
+            {"$match": {"created_at": in_week, "rating": {"$gte": HELPFUL_RATING}}},
+            {"$project": {"_id": 0, "metric": {"$literal": "helpful"}, "user": "$target_id"}}
+        ]}},
+        {"$unionWith": {"coll": bot.posts_col.name, "pipeline": [
+            # Posts store created_at as an epoch float
+            {"$match": {
+                "status": {"$in": ["pending", "active", "expired"]},
+                "created_at": {"$gte": start.timestamp(), "$lt": end.timestamp()}
+            }},
+            {"$project": {"_id": 0, "metric": {"$literal": "contributor"}, "user": "$author_id"}}
+        ]}},
+        {"$match": {"user": {"$nin": [None, bot.FOUNDER_ID]}}},
+        {"$group": {"_id": {"metric": "$metric", "user": "$user"}, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id.user": 1}},
+        {"$group": {"_id": "$_id.metric", "user": {"$first": "$_id.user"}, "count": {"$first": "$count"}}}
+    ]
+
+
+class WeeklyMissionJob:
+    """Awards WEEKLY_MISSIONS once per week from a checkpointed run
+
+    Each week has a document in ``missions`` that moves from ``paying`` (winners
+    fixed) to ``paid``. Winners are computed once and stored, so a restart
+    resumes payment without re-aggregating. Payments are guarded per user and
+    mission, so replaying them never double-pays.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def run_week(self, start: datetime):
+        week_id = f"weekly:{start.date().isoformat()}"
+        checkpoint = await self.bot.missions_col.find_one({"_id": week_id})
+        if checkpoint and checkpoint["status"] == "paid":
+            return checkpoint
+
+        if not checkpoint:
+            end = start + timedelta(weeks=1)
+            rows = await self.bot.transactions_col.aggregate(weekly_pipeline(self.bot, start, end)).to_list(length=None)
+            winners = {
+                WEEKLY_METRICS[row["_id"]]: {"user_id": row["user"], "count": row["count"]}
+                for row in rows if row["_id"] in WEEKLY_METRICS
+            }
+            checkpoint = {
+                "_id": week_id,
+                "kind": "weekly",
+                "week_start": start,
+                "winners": winners,
+                "status": "paying",
+                "computed_at": datetime.utcnow()
+            }
+            try:
+                await self.bot.missions_col.insert_one(checkpoint)
+            except DuplicateKeyError:
+                # Another run fixed the winners first; pay what it recorded
+                checkpoint = await self.bot.missions_col.find_one({"_id": week_id})
+
+        await self.pay(checkpoint)
+        await self.bot.missions_col.update_one(
+            {"_id": week_id},
+            {"$set": {"status": "paid", "paid_at": datetime.utcnow()}}
+        )
+        checkpoint["status"] = "paid"
+        return checkpoint
+
+    async def pay(self, checkpoint: dict):
+        week_id = checkpoint["_id"]
+        winners = checkpoint["winners"]
+        if not winners:
+            return
+
+        ledger_ops = []
+        now = datetime.utcnow()
+        for mission, winner in winners.items():
+            reward = WEEKLY_MISSIONS[mission]
+            ledger_ops.append(InsertOne({
+                "_id": f"{week_id}:{mission}",
+                "user_id": winner["user_id"],
+                "type": "mission_reward",
+                "amount": reward,
+                "details": {"mission": mission, "week": week_id, "count": winner["count"]},
+                "timestamp": now
+            }))
+
+        # One guarded update per winner (a handful a week), so it is known
+        # exactly which were paid now and which before a restart
+        results = await asyncio.gather(*(
+            self.bot.users_col.update_one(
+                {"_id": winner["user_id"], f"weekly_awards.{mission}": {"$ne": week_id}},
+                {"$inc": {"rc_balance": WEEKLY_MISSIONS[mission]}, "$set": {f"weekly_awards.{mission}": week_id}}
+            )
+            for mission, winner in winners.items()
+        ))
+
+        paid = 0
+        for (mission, winner), result in zip(winners.items(), results):
+            self.bot.user_cache.invalidate(winner["user_id"])
+            if result.modified_count:
+                self.bot.leaderboards.adjust("rc_balance", winner["user_id"], WEEKLY_MISSIONS[mission])
+                paid += WEEKLY_MISSIONS[mission]
+        if paid:
+            await self.bot.record_supply_change(circulating=paid, minted=paid)
+        if not all(result.modified_count for result in results):
+            logger.warning(f"Weekly missions {week_id} resumed after a partial payout")
+
+        try:
+            await self.bot.transactions_col.bulk_write(ledger_ops, ordered=False)
+        except BulkWriteError as e:
+            # Rows already written before a restart
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+        summary = ', '.join(f"{mission} -> {winner['user_id']}" for mission, winner in winners.items())
+        logger.info(f"🏅 Paid weekly missions {week_id}: {summary}")
+
+    async def run(self):
+        """Award the last completed week now, then again every Monday"""
+        await self.bot.wait_until_ready()
+
+        while not self.bot.is_closed():
+            this_week = week_start(datetime.utcnow())
+            try:
+                await self.run_week(this_week - timedelta(weeks=1))
+            except Exception as e:
+                logger.error(f"Error awarding weekly missions: {e}")
+
+            next_week = this_week + timedelta(weeks=1)
+            await asyncio.sleep(max(60, (next_week - datetime.utcnow()).total_seconds() + 60))
@@ -0,0 +1,249 @@
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import discord
+from discord import app_commands
+from pymongo import monitoring
+
+logger = logging.getLogger('RCN_Prime')
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Phases every command is timed in: wall time, initial response, Mongo, other Discord calls
+PHASES = ("total", "defer", "db", "api")
+
+# Timing of the app command running in the current task, if any
+current = contextvars.ContextVar("perf_command", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, Prometheus style"""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+
+class CommandTiming:
+    __slots__ = ("name", "started", "defer", "db", "api")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.defer = 0.0
+        self.db = 0.0
+        self.api = 0.0
+
+
+class MongoListener(monitoring.CommandListener):
+    """Counts and times every Mongo command by collection and operation
+
+    Motor runs pymongo in executor threads with a copy of the caller's
+    context, so the running app command (if any) is charged the DB time.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        with self.lock:
+            self.pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def succeeded(self, event):
+        self.finish(event, failed=False)
+
+    def failed(self, event):
+        self.finish(event, failed=True)
+
+    def finish(self, event, failed: bool):
+        seconds = event.duration_micros / 1e6
+        with self.lock:
+            key = self.pending.pop((event.connection_id, event.request_id), None)
+            if key is None:
+                return
+            self.registry.mongo.setdefault(key, Histogram()).observe(seconds)
+            if failed:
+                self.registry.mongo_failures[key] += 1
+        timing = current.get()
+        if timing is not None:
+            timing.db += seconds
+
+
+class TimedCommandTree(app_commands.CommandTree):
+    """Command tree that starts a timing for every app command"""
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        self.client.perf.begin(interaction)
+        return True
+
+
+def install_api_timing():
+    """Charge Discord REST calls to the running app command
+
+    Wraps the bot and webhook HTTP clients once per process. Interaction
+    callbacks (defer or first message) count as defer time, everything
+    else as API time.
+    """
+    from discord.http import HTTPClient
+    from discord.webhook.async_ import AsyncWebhookAdapter
+
+    for cls in (HTTPClient, AsyncWebhookAdapter):
+        original = cls.request
+        if getattr(original, "perf_timed", False):
+            continue
+
+        async def request(self, route, *args, _original=original, **kwargs):
+            timing = current.get()
+            if timing is None:
+                return await _original(self, route, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await _original(self, route, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if route.path.endswith("/callback"):
+                    timing.defer += elapsed
+                else:
+                    timing.api += elapsed
+
+        request.perf_timed = True
+        cls.request = request
+
+
+class PerfRegistry:
+    """Process-wide latency data for commands, Mongo and background tasks"""
+
+    def __init__(self):
+        self.commands = {}
+        self.errors = Counter()
+        self.mongo = {}
+        self.mongo_failures = Counter()
+        self.tasks = {}
+        self.last_tick = {}
+        self.started_at = datetime.utcnow()
+        self.listener = MongoListener(self)
+        self.server = None
+        install_api_timing()
+
+    def begin(self, interaction: discord.Interaction):
+        name = interaction.command.qualified_name if interaction.command else "?"
+        timing = CommandTiming(name)
+        interaction.extras["perf"] = timing
+        current.set(timing)
+
+    def finish(self, interaction: discord.Interaction):
+        timing = interaction.extras.pop("perf", None)
+        if timing is None:
+            return
+        phases = self.commands.setdefault(timing.name, {phase: Histogram() for phase in PHASES})
+        phases["total"].observe(time.perf_counter() - timing.started)
+        phases["defer"].observe(timing.defer)
+        phases["db"].observe(timing.db)
+        phases["api"].observe(timing.api)
+
+    def error(self, interaction: discord.Interaction, error: Exception):
+        """Log an exception a command handled itself and count it"""
+        name = interaction.command.qualified_name if interaction.command else "?"
+        self.errors[name] += 1
+        logger.error(f"Error in /{name}: {error}", exc_info=error)
+
+    @contextmanager
+    def tick(self, task: str):
+        """Time one iteration of a background task"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tasks.setdefault(task, Histogram()).observe(time.perf_counter() - started)
+            self.last_tick[task] = datetime.utcnow()
+
+    def prometheus(self):
+        """Everything recorded so far in Prometheus text format"""
+        lines = []
+
+        def histogram(metric, labels, hist):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, hist.counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f'{metric}_sum{{{labels}}} {hist.sum:.6f}')
+            lines.append(f'{metric}_count{{{labels}}} {hist.count}')
+
+        lines.append("# TYPE rcn_command_seconds histogram")
+        for name, phases in sorted(self.commands.items()):
+            for phase, hist in phases.items():
+                histogram("rcn_command_seconds", f'command="{name}",phase="{phase}"', hist)
+
+        lines.append("# TYPE rcn_command_errors_total counter")
+        for name, count in sorted(self.errors.items()):
+            lines.append(f'rcn_command_errors_total{{command="{name}"}} {count}')
+
+        lines.append("# TYPE rcn_mongo_command_seconds histogram")
+        with self.listener.lock:
+            mongo = sorted(self.mongo.items())
+            failures = sorted(self.mongo_failures.items())
+        for (collection, op), hist in mongo:
+            histogram("rcn_mongo_command_seconds", f'collection="{collection}",op="{op}"', hist)
+
+        lines.append("# TYPE rcn_mongo_command_failures_total counter")
+        for (collection, op), count in failures:
+            lines.append(f'rcn_mongo_command_failures_total{{collection="{collection}",op="{op}"}} {count}')
+
+        lines.append("# TYPE rcn_task_tick_seconds histogram")
+        for task, hist in sorted(self.tasks.items()):
+            histogram("rcn_task_tick_seconds", f'task="{task}"', hist)
+
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, port: int):
+        """Expose /metrics over HTTP for a Prometheus scraper"""
+        from aiohttp import web
+
+        async def metrics(request):
+            return web.Response(text=self.prometheus(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        self.server = web.AppRunner(app)
+        await self.server.setup()
+        await web.TCPSite(self.server, "0.0.0.0", port).start()
+        logger.info(f"📊 Serving metrics on port {port}")
+
+    async def close(self):
+        if self.server:
+            await self.server.cleanup()
@@ -0,0 +1,51 @@
+import bisect
+from collections import deque
+from datetime import datetime
+
+# Ticks kept in memory; 30 days of hourly engine ticks plus manual overrides
+PRICE_BUFFER_SIZE = 1024
+
+
+class PriceBuffer:
+    """Fixed-size ring of recent (timestamp, price) ticks, oldest first"""
+
+    def __init__(self, size: int = PRICE_BUFFER_SIZE):
+        self.ticks = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def append(self, timestamp: datetime, price: float):
+        # Ticks normally arrive in order; drop anything older than the newest
+        if self.ticks and timestamp < self.ticks[-1][0]:
+            return
+        self.ticks.append((timestamp, price))
+
+    @property
+    def latest(self):
+        return self.ticks[-1][1] if self.ticks else None
+
+    @property
+    def latest_timestamp(self):
+        return self.ticks[-1][0] if self.ticks else None
+
+    def price_at(self, timestamp: datetime):
+        """Price in effect at ``timestamp``, or None if it predates the buffer"""
+        index = bisect.bisect_right(self.ticks, (timestamp, float('inf')))
+        return self.ticks[index - 1][1] if index else None
+
+    def since(self, timestamp: datetime):
+        """Ticks at or after ``timestamp``"""
+        index = bisect.bisect_left(self.ticks, (timestamp, float('-inf')))
+        return [self.ticks[i] for i in range(index, len(self.ticks))]
+
+    async def hydrate(self, bot):
+        """Load the most recent ticks from price_history"""
+        cursor = bot.price_history_col.find(
+            {}, projection={"timestamp": 1, "new_price": 1}
+        ).sort("timestamp", -1).limit(self.ticks.maxlen)
+        recent = await cursor.to_list(length=self.ticks.maxlen)
+
+        self.ticks.clear()
+        for tick in reversed(recent):
+            self.ticks.append((tick["timestamp"], tick["new_price"]))
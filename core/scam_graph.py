@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger('RCN_Prime')
+
+# Ledger window analysed by each run
+RING_WINDOW = timedelta(days=30)
+# Ignore pairs with fewer transfers than this; keeps the graph small
+MIN_EDGE_TRANSFERS = 2
+# Rings larger than this are treated as ordinary community activity
+MAX_RING_SIZE = 12
+# Clusters scoring at least this are written to scam_reports
+RING_SCORE_THRESHOLD = 0.6
+# How often the analysis runs (seconds)
+RING_SCAN_INTERVAL = 24 * 3600
+
+TRANSFER_TYPES = ["payment", "trade"]
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, node):
+        parent = self.parent.setdefault(node, node)
+        if parent == node:
+            self.size.setdefault(node, 1)
+            return node
+        root = self.find(parent)
+        self.parent[node] = root
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def groups(self):
+        groups = defaultdict(list)
+        for node in self.parent:
+            groups[self.find(node)].append(node)
+        return list(groups.values())
+
+
+def strongly_connected(graph: dict):
+    """Tarjan's algorithm without recursion; returns components of size >= 2"""
+    index, lowlink, on_stack = {}, {}, set()
+    stack, components = [], []
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1:
+                    components.append(component)
+
+    return components
+
+
+def score_ring(members: list, edges: dict):
+    """Score how ring-like a strongly connected group of accounts is (0-1)
+
+    Combines reciprocity (share of transfers that are paid straight back),
+    density (how close to every member paying every other) and how evenly RC
+    flows back out of members it flowed into.
+    """
+    member_set = set(members)
+    inner = {(a, b): e for (a, b), e in edges.items() if a in member_set and b in member_set}
+    if not inner:
+        return 0.0, 0, 0
+
+    n = len(members)
+    reciprocal = sum(1 for (a, b) in inner if (b, a) in inner) / len(inner)
+    density = len(inner) / (n * (n - 1))
+
+    inflow, outflow = defaultdict(float), defaultdict(float)
+    for (a, b), e in inner.items():
+        outflow[a] += e["volume"]
+        inflow[b] += e["volume"]
+    balance = sum(min(inflow[m], outflow[m]) / max(inflow[m], outflow[m]) for m in members if max(inflow[m], outflow[m])) / n
+
+    volume = sum(e["volume"] for e in inner.values())
+    transfers = sum(e["count"] for e in inner.values())
+    return 0.4 * reciprocal + 0.2 * density + 0.4 * balance, volume, transfers
+
+
+class RingDetector:
+    """Batch job finding rings of accounts that pass RC around in circles
+
+    Transfers are reduced server-side to one edge per (sender, recipient) pair,
+    and pairs below MIN_EDGE_TRANSFERS are dropped, so memory is bounded by the
+    number of repeat trading pairs rather than by ledger rows. Strongly
+    connected components are candidate rings; union-find over the same edges
+    gives the wider cluster each ring belongs to.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def edge_pipeline(self, since: datetime):
+        return [
+            {"$match": {"type": {"$in": TRANSFER_TYPES}, "timestamp": {"$gte": since}, "details.to": {"$exists": True}}},
+            {"$group": {
+                "_id": {"from": "$user_id", "to": "$details.to"},
+                "count": {"$sum": 1},
+                "volume": {"$sum": {"$abs": "$amount"}}
+            }},
+            {"$match": {"count": {"$gte": MIN_EDGE_TRANSFERS}}}
+        ]
+
+    async def scan(self):
+        """Run one analysis and return the flagged rings"""
+        since = datetime.utcnow() - RING_WINDOW
+        graph = defaultdict(list)
+        edges = {}
+        clusters = UnionFind()
+
+        cursor = self.bot.transactions_col.aggregate(self.edge_pipeline(since), allowDiskUse=True)
+        async for row in cursor:
+            a, b = row["_id"]["from"], row["_id"]["to"]
+            if self.bot.FOUNDER_ID in (a, b):
+                continue
+            graph[a].append(b)
+            edges[(a, b)] = {"count": row["count"], "volume": row["volume"]}
+            clusters.union(a, b)
+
+        cluster_of = {}
+        for group in clusters.groups():
+            for member in group:
+                cluster_of[member] = group
+
+        # Tarjan is CPU bound; keep the event loop responsive
+        components = await asyncio.to_thread(strongly_connected, dict(graph))
+
+        flagged = []
+        for members in components:
+            if len(members) > MAX_RING_SIZE:
+                continue
+            score, volume, transfers = score_ring(members, edges)
+            if score < RING_SCORE_THRESHOLD:
+                continue
+            members = sorted(members)
+            flagged.append({
+                "members": members,
+                "score": round(score, 3),
+                "volume": volume,
+                "transfers": transfers,
+                "cluster_size": len(cluster_of[members[0]])
+            })
+
+        await self.report(flagged)
+        logger.info(f"🕸️ Ring scan: {len(edges)} edges, {len(components)} cycles, {len(flagged)} flagged")
+        return flagged
+
+    async def report(self, flagged: list):
+        if not flagged:
+            return
+        now = datetime.utcnow()
+        ops = []
+        for ring in flagged:
+            ring_id = hashlib.sha1(','.join(map(str, ring["members"])).encode()).hexdigest()
+            ops.append(UpdateOne(
+                {"_id": f"ring:{ring_id}"},
+                {
+                    "$set": {**ring, "last_detected_at": now},
+                    "$setOnInsert": {"type": "ring", "status": "open", "first_detected_at": now},
+                    "$inc": {"detections": 1}
+                },
+                upsert=True
+            ))
+        await self.bot.scam_reports_col.bulk_write(ops, ordered=False)
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+
+        while not self.bot.is_closed():
+            try:
+                flagged = await self.scan()
+                if flagged:
+                    await self.bot.report_scam(
+                        "🕸️ Suspected Trading Rings",
+                        '\n'.join(
+                            f"Score {ring['score']:.2f} • {ring['volume']:,} RC • " + ', '.join(f"<@{m}>" for m in ring['members'])
+                            for ring in flagged[:10]
+                        )
+                    )
+            except Exception as e:
+                logger.error(f"Error scanning for rings: {e}")
+            await asyncio.sleep(RING_SCAN_INTERVAL)
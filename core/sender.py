@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+
+import discord
+
+logger = logging.getLogger('RCN_Prime')
+
+# Discord allows up to 10 embeds per message...
+EMBEDS_PER_MESSAGE = 10
+# ...with at most this many characters across all of them
+EMBED_CHARS_PER_MESSAGE = 6000
+# Pace each channel to this many messages per window (seconds)
+MESSAGES_PER_WINDOW = 5
+SEND_WINDOW = 5.0
+# Attempts for a batch failing with a server error before it is dropped
+SEND_RETRIES = 5
+
+
+class ChannelSender:
+    """Rate-limit-aware publisher for bulk channel posts
+
+    Embeds are queued per channel and drained by one task per channel that
+    packs as many embeds into each message as Discord's count and size limits
+    allow and paces sends under the per-channel message limit instead of
+    bursting into 429s. Batches failing with a server error go back to the
+    front of the queue; a batch Discord rejects is retried one embed at a
+    time so one bad embed doesn't take the others with it.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.queues = defaultdict(deque)
+        self.sent_at = defaultdict(deque)
+        self.workers = {}
+
+    def publish(self, channel_id: int, *embeds: discord.Embed):
+        """Queue embeds for a channel and make sure a worker is draining it"""
+        self.queues[channel_id].extend(embeds)
+        worker = self.workers.get(channel_id)
+        if worker is None or worker.done():
+            self.workers[channel_id] = asyncio.create_task(self.drain(channel_id))
+
+    async def wait_for_slot(self, channel_id: int):
+        sent = self.sent_at[channel_id]
+        now = time.monotonic()
+        while sent and now - sent[0] >= SEND_WINDOW:
+            sent.popleft()
+        if len(sent) >= MESSAGES_PER_WINDOW:
+            await asyncio.sleep(SEND_WINDOW - (now - sent[0]))
+            sent.popleft()
+        sent.append(time.monotonic())
+
+    async def drain(self, channel_id: int):
+        queue = self.queues[channel_id]
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            logger.warning(f"Dropping {len(queue)} embeds for unknown channel {channel_id}")
+            queue.clear()
+            return
+
+        failures = 0
+        while queue:
+            batch = self.next_batch(queue)
+            await self.wait_for_slot(channel_id)
+            try:
+                await channel.send(embeds=batch)
+            except (discord.Forbidden, discord.NotFound) as e:
+                logger.error(f"Dropping {len(batch) + len(queue)} embeds for channel {channel_id}: {e}")
+                queue.clear()
+                return
+            except discord.HTTPException as e:
+                transient = e.status >= 500 or e.status == 429
+                if transient and failures < SEND_RETRIES:
+                    failures += 1
+                    queue.extendleft(reversed(batch))
+                    delay = 2 ** failures
+                    logger.warning(f"Failed to publish {len(batch)} embeds to {channel_id}, retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+                elif len(batch) > 1 and not transient:
+                    await self.send_each(channel, batch)
+                else:
+                    logger.error(f"Failed to publish {len(batch)} embeds to {channel_id}: {e}")
+                    failures = 0
+            else:
+                failures = 0
+
+    @staticmethod
+    def next_batch(queue: deque):
+        """Pop the longest run of embeds that fits in one message"""
+        batch = [queue.popleft()]
+        size = len(batch[0])
+        while queue and len(batch) < EMBEDS_PER_MESSAGE and size + len(queue[0]) <= EMBED_CHARS_PER_MESSAGE:
+            size += len(queue[0])
+            batch.append(queue.popleft())
+        return batch
+
+    async def send_each(self, channel, batch: list):
+        for embed in batch:
+            await self.wait_for_slot(channel.id)
+            try:
+                await channel.send(embed=embed)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to publish embed {embed.title!r} to {channel.id}: {e}")
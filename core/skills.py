@@ -0,0 +1,17 @@
+from config import SKILLS
+
+# One bit per SKILLS entry, by list position
+SKILL_BITS = {skill: 1 << index for index, skill in enumerate(SKILLS)}
+
+
+def skill_mask(skills):
+    """Encode a list of skill names as a bitmask, ignoring unknown names"""
+    mask = 0
+    for skill in skills:
+        mask |= SKILL_BITS.get(skill, 0)
+    return mask
+
+
+def skills_from_mask(mask: int):
+    """Decode a bitmask back into skill names in SKILLS order"""
+    return [skill for skill, bit in SKILL_BITS.items() if mask & bit]
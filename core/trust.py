@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger('RCN_Prime')
+
+# A review's weight halves every 90 days
+TRUST_HALF_LIFE_MS = 90 * 86400 * 1000
+
+# How often trust scores are recomputed from the reviews collection (seconds)
+TRUST_RECOMPUTE_INTERVAL = 24 * 3600
+
+
+def reviewer_weight(reviewer: dict):
+    """How much a review counts, from the reviewer's own standing"""
+    if reviewer.get("scam_status", "clean") != "clean":
+        return 0.1
+    # Trust scores run 0-5, so trusted reviewers count up to twice as much
+    return 1 + min(max(reviewer.get("trust_score", 0), 0), 5) / 5
+
+
+def decay(age_ms):
+    """Aggregation expression for the decay factor of something ``age_ms`` old"""
+    return {"$pow": [0.5, {"$divide": [age_ms, TRUST_HALF_LIFE_MS]}]}
+
+
+def trust_update(rating: int, weight: float, now: datetime):
+    """Pipeline update folding one review into a user's running trust score
+
+    ``trust_sum`` and ``trust_weight`` are decayed to ``now`` before the new
+    review is added, so the score is a time-decayed weighted mean kept in O(1).
+    """
+    age = {"$subtract": [now, {"$ifNull": ["$trust_updated_at", now]}]}
+    return [
+        {"$set": {"_decay": decay(age)}},
+        {"$set": {
+            "trust_sum": {"$add": [{"$multiply": [{"$ifNull": ["$trust_sum", 0]}, "$_decay"]}, weight * rating]},
+            "trust_weight": {"$add": [{"$multiply": [{"$ifNull": ["$trust_weight", 0]}, "$_decay"]}, weight]},
+            "total_reviews": {"$add": [{"$ifNull": ["$total_reviews", 0]}, 1]},
+            "trust_updated_at": now
+        }},
+        {"$set": {"trust_score": {"$cond": [
+            {"$gt": ["$trust_weight", 0]}, {"$divide": ["$trust_sum", "$trust_weight"]}, 0
+        ]}}},
+        {"$unset": "_decay"}
+    ]
+
+
+class TrustService:
+    """Writes reviews and keeps users' trust scores up to date"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def add_review(self, reviewer: dict, target_id: int, rating: int, comment: str):
+        """Insert a review and fold it into the target's trust score atomically
+
+        Both writes share a transaction where the deployment supports them;
+        standalone servers fall back to two writes that the recompute job
+        reconciles if one is lost.
+        """
+        now = datetime.utcnow()
+        weight = reviewer_weight(reviewer)
+        review = {
+            "reviewer_id": reviewer["_id"],
+            "target_id": target_id,
+            "rating": rating,
+            "comment": comment,
+            "weight": weight,
+            "created_at": now
+        }
+
+        async def write(session=None):
+            await self.bot.reviews_col.insert_one(review, session=session)
+            return await self.bot.users_col.find_one_and_update(
+                {"_id": target_id},
+                trust_update(rating, weight, now),
+                projection={"trust_score": 1, "total_reviews": 1},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+
+        try:
+            async with await self.bot.client.start_session() as session:
+                target = await session.with_transaction(write)
+        except OperationFailure as e:
+            # IllegalOperation: transactions need a replica set
+            if e.code != 20:
+                raise
+            target = await write()
+
+        self.bot.user_cache.invalidate(target_id)
+        self.bot.leaderboards.adjust("reviews_given", reviewer["_id"], 1)
+        if target:
+            self.bot.leaderboards.set("trust_score", target_id, target["trust_score"])
+        return review, target
+
+    def recompute_pipeline(self, now: datetime):
+        """Rebuild every user's trust fields from the reviews collection"""
+        age = {"$subtract": [now, "$created_at"]}
+        return [
+            {"$project": {
+                "target_id": 1,
+                "weighted": {"$multiply": ["$weight", decay(age)]},
+                "rating": 1
+            }},
+            {"$group": {
+                "_id": "$target_id",
+                "trust_sum": {"$sum": {"$multiply": ["$weighted", "$rating"]}},
+                "trust_weight": {"$sum": "$weighted"},
+                "total_reviews": {"$sum": 1}
+            }},
+            {"$set": {
+                "trust_score": {"$cond": [
+                    {"$gt": ["$trust_weight", 0]}, {"$divide": ["$trust_sum", "$trust_weight"]}, 0
+                ]},
+                "trust_updated_at": now
+            }},
+            {"$merge": {"into": self.bot.users_col.name, "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+        ]
+
+    async def recompute(self):
+        """Correct drift in the running scores with a full pass over reviews"""
+        await self.bot.reviews_col.aggregate(self.recompute_pipeline(datetime.utcnow())).to_list(length=None)
+        self.bot.user_cache.clear()
+        logger.info("⭐ Recomputed trust scores from reviews")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(TRUST_RECOMPUTE_INTERVAL)
+            try:
+                await self.recompute()
+                await self.bot.leaderboards.rebuild()
+            except Exception as e:
+                logger.error(f"Error recomputing trust scores: {e}")